@@ -579,8 +579,10 @@ def visualize_menu(self, binary_data: List[int], encoded_data: List[int],
 '''
 
 import wave
+from functools import lru_cache
 import numpy as np
 import matplotlib.pyplot as plt
+from teste2audio import TransmissionSystem, WavReader, WavStreamWriter
 
 # Dicionário de sílabas para código Manchester
 syllable_code = {
@@ -594,27 +596,85 @@ SAMPLE_RATE = 44100  # Hz
 BIT_DURATION = 0.2  # segundos por bit
 FREQ_HIGH = 1200    # Hz para bit 1
 FREQ_LOW = 600       # Hz para bit 0
+FDM_SPACING = FREQ_HIGH - FREQ_LOW  # Hz entre tons vizinhos no modo multiportadora
 
-def generate_manchester_signal(bits):
-    """Gera um sinal Manchester para uma sequência de bits"""
-    samples_per_bit = int(SAMPLE_RATE * BIT_DURATION)
-    t = np.linspace(0, BIT_DURATION, samples_per_bit, endpoint=False)
+@lru_cache(maxsize=None)
+def bit_templates(sample_rate, bit_duration, freq_high, freq_low):
+    """Formas de onda dos bits '0' (linha 0) e '1' (linha 1), calculadas uma vez por configuração"""
+    samples_per_bit = int(sample_rate * bit_duration)
+    half = samples_per_bit // 2
+    t = np.linspace(0, bit_duration, samples_per_bit, endpoint=False)
+    
+    high = np.sin(2 * np.pi * freq_high * t) * 0.5
+    low = np.sin(2 * np.pi * freq_low * t) * 0.5
+    
+    templates = np.empty((2, samples_per_bit))
+    # Bit 0: primeira metade em baixa frequência, segunda metade em alta
+    templates[0, :half] = low[:half]
+    templates[0, half:] = high[half:]
+    # Bit 1: primeira metade em alta frequência, segunda metade em baixa
+    templates[1, :half] = high[:half]
+    templates[1, half:] = low[half:]
+    
+    # O cache devolve sempre o mesmo array, então ele não pode ser alterado
+    templates.flags.writeable = False
+    return templates
+
+def bit_indices(bits):
+    """Índice de cada bit da string: 1 para '1', 0 para qualquer outro caractere"""
+    return (np.frombuffer(bits.encode(), dtype=np.uint8) == ord('1')).astype(np.intp)
+
+def cpfsk_signal(bits, bit_duration=BIT_DURATION, sample_rate=SAMPLE_RATE, initial_phase=0.0,
+                 freqs=(FREQ_LOW, FREQ_HIGH)):
+    """
+    Sinal Manchester em FSK de fase contínua (CPFSK).
     
-    signal = np.array([])
+    Monta a frequência instantânea de todas as amostras (mesma divisão em
+    meios bits de bit_templates), integra com uma soma acumulada para obter
+    a fase e avalia um único seno. Sem saltos de fase nas trocas de tom, o
+    espectro fica concentrado perto de FREQ_LOW e FREQ_HIGH.
     
-    for bit in bits:
-        if bit == '1':
-            # Primeira metade: 1 (alta frequência), segunda metade: 0 (baixa frequência)
-            part1 = np.sin(2 * np.pi * FREQ_HIGH * t[:samples_per_bit//2]) * 0.5
-            part2 = np.sin(2 * np.pi * FREQ_LOW * t[samples_per_bit//2:]) * 0.5
-        else:
-            # Primeira metade: 0 (baixa frequência), segunda metade: 1 (alta frequência)
-            part1 = np.sin(2 * np.pi * FREQ_LOW * t[:samples_per_bit//2]) * 0.5
-            part2 = np.sin(2 * np.pi * FREQ_HIGH * t[samples_per_bit//2:]) * 0.5
-        
-        signal = np.concatenate((signal, part1, part2))
+    Retorna (sinal, fase inicial do bloco seguinte), para gerar o áudio em
+    blocos sem perder a continuidade. `freqs` é o par de tons (baixo, alto).
+    """
+    samples_per_bit = int(sample_rate * bit_duration)
+    half = samples_per_bit // 2
+    indices = bit_indices(bits)
+    
+    # Frequência de cada metade: bit 1 = alta -> baixa, bit 0 = baixa -> alta
+    low, high = freqs
+    halves = np.array([[low, high], [high, low]], dtype=np.float64)[indices]
+    freq = np.empty((len(indices), samples_per_bit))
+    freq[:, :half] = halves[:, :1]
+    freq[:, half:] = halves[:, 1:]
+    freq = freq.reshape(-1)
+    
+    # Fase no início de cada amostra: soma das frequências das amostras anteriores
+    step = 2 * np.pi / sample_rate
+    cumulative = np.cumsum(freq)
+    phase = initial_phase + step * (cumulative - freq)
+    
+    next_phase = initial_phase + step * cumulative[-1] if len(freq) else initial_phase
+    return np.sin(phase) * 0.5, np.mod(next_phase, 2 * np.pi)
+
+def generate_manchester_signal(bits, continuous_phase=False, bit_duration=BIT_DURATION):
+    """
+    Gera um sinal Manchester para uma sequência de bits.
+    Com continuous_phase, usa a síntese CPFSK de cpfsk_signal.
+    """
+    if continuous_phase:
+        return cpfsk_signal(bits, bit_duration)[0]
     
-    return signal
+    templates = bit_templates(SAMPLE_RATE, bit_duration, FREQ_HIGH, FREQ_LOW)
+    
+    # Índice do modelo de cada bit: 1 para '1', 0 para qualquer outro caractere
+    indices = bit_indices(bits)
+    
+    # Monta o sinal copiando os modelos direto para o buffer de saída
+    signal = np.empty((len(indices), templates.shape[1]))
+    np.take(templates, indices, axis=0, out=signal)
+    
+    return signal.reshape(-1)
 
 def text_to_manchester(text):
     """Converte texto para sequência Manchester"""
@@ -631,6 +691,56 @@ def text_to_manchester(text):
     
     return manchester_bits
 
+def manchester_to_text(bits):
+    """Converte uma sequência Manchester de volta em sílabas ('?' para códigos desconhecidos)"""
+    code_syllable = {code: syllable for syllable, code in syllable_code.items()}
+    codes = [bits[i:i+4] for i in range(0, len(bits) - len(bits) % 4, 4)]
+    return "".join(code_syllable.get(code, "?") for code in codes)
+
+def tone_power(windows, freqs, sample_rate=SAMPLE_RATE):
+    """
+    Potência de cada janela (linhas de `windows`) em cada frequência de `freqs`.
+    Equivale a um banco de filtros Goertzel (DFT de um único bin), calculado
+    para todas as janelas de uma vez com dois produtos de matrizes.
+    """
+    n = np.arange(windows.shape[1])
+    phase = 2 * np.pi * np.outer(n, freqs) / sample_rate
+    real = windows @ np.cos(phase)
+    imag = windows @ np.sin(phase)
+    return real ** 2 + imag ** 2
+
+def demodulate_manchester_signal(signal, sample_rate=SAMPLE_RATE, bit_duration=BIT_DURATION):
+    """Recupera a sequência de bits de um sinal gerado por generate_manchester_signal"""
+    samples_per_bit = int(sample_rate * bit_duration)
+    half = samples_per_bit // 2
+    n_bits = len(signal) // samples_per_bit
+    bit_windows = np.asarray(signal[:n_bits * samples_per_bit], dtype=np.float64)
+    bit_windows = bit_windows.reshape(n_bits, samples_per_bit)
+    
+    # Quanto cada metade do bit é "mais alta" do que "baixa" (coluna 1 = FREQ_HIGH)
+    freqs = (FREQ_LOW, FREQ_HIGH)
+    first = tone_power(bit_windows[:, :half], freqs, sample_rate)
+    second = tone_power(bit_windows[:, half:], freqs, sample_rate)
+    first_high = (first[:, 1] - first[:, 0]) / half
+    second_high = (second[:, 1] - second[:, 0]) / (samples_per_bit - half)
+    
+    # Bit 1 = alta -> baixa, bit 0 = baixa -> alta
+    bits = np.where(first_high > second_high, ord('1'), ord('0')).astype(np.uint8)
+    return bits.tobytes().decode()
+
+def decode_audio(filename, bits_per_window=256, bit_duration=BIT_DURATION):
+    """
+    Demodula um arquivo gerado por save_audio e retorna (bits, texto).
+    O arquivo é mapeado em memória e lido em janelas de bits inteiros.
+    """
+    with WavReader(filename) as reader:
+        samples_per_bit = int(reader.sample_rate * bit_duration)
+        bits = "".join(
+            demodulate_manchester_signal(block / 32767, reader.sample_rate, bit_duration)
+            for _, block in reader.symbol_windows(samples_per_bit, bits_per_window)
+        )
+    return bits, manchester_to_text(bits)
+
 def save_audio(signal, filename):
     """Salva o sinal como arquivo WAV"""
     signal_normalized = np.int16((signal / np.max(np.abs(signal))) * 32767)
@@ -640,6 +750,97 @@ def save_audio(signal, filename):
         wav_file.setframerate(SAMPLE_RATE)
         wav_file.writeframes(signal_normalized.tobytes())
 
+def save_audio_stream(bits, filename, block_bits=64, continuous_phase=False, bit_duration=BIT_DURATION):
+    """Gera e salva o sinal em blocos de bits, sem manter o áudio inteiro na memória"""
+    # Os tons têm amplitude 0.5, então esse é o pico usado na conversão para 16 bits
+    with WavStreamWriter(filename, SAMPLE_RATE, "int16", peak=0.5, queue_blocks=4) as writer:
+        phase = 0.0
+        for start in range(0, len(bits), block_bits):
+            block = bits[start:start + block_bits]
+            if continuous_phase:
+                # A fase final de um bloco é a inicial do seguinte
+                signal, phase = cpfsk_signal(block, bit_duration, initial_phase=phase)
+            else:
+                signal = generate_manchester_signal(block, bit_duration=bit_duration)
+            writer.write(signal)
+
+def fdm_tone_pairs(n_channels, sample_rate=SAMPLE_RATE):
+    """
+    Pares de tons (baixo, alto) de cada canal do modo multiportadora.
+    O canal 0 usa FREQ_LOW/FREQ_HIGH e os seguintes sobem de 2 * FDM_SPACING;
+    com meios bits de duração múltipla de 1 / FDM_SPACING os tons são ortogonais.
+    """
+    pairs = FREQ_LOW + FDM_SPACING * (2 * np.arange(n_channels)[:, np.newaxis] + np.arange(2))
+    if n_channels and pairs[-1, 1] >= sample_rate / 2:
+        raise ValueError(f"{n_channels} canais não cabem abaixo de {sample_rate / 2:.0f} Hz")
+    return pairs
+
+def generate_fdm_signal(messages, bit_duration=BIT_DURATION, sample_rate=SAMPLE_RATE):
+    """
+    Modo multiportadora (FDM): cada mensagem vira os bits de um
+    TransmissionSystem, modulados em CPFSK Manchester no seu próprio par de
+    tons, e os canais são somados em um único sinal. Canais que terminam
+    antes ficam em silêncio; o pico da soma não passa de 0.5.
+    """
+    ts = TransmissionSystem()
+    pairs = fdm_tone_pairs(len(messages), sample_rate)
+    samples_per_bit = int(sample_rate * bit_duration)
+    
+    channel_bits = [ts.string_to_binary(message).data for message in messages]
+    n_bits = max((len(bits) for bits in channel_bits), default=0)
+    signal = np.zeros(n_bits * samples_per_bit)
+    
+    for bits, freqs in zip(channel_bits, pairs):
+        text_bits = (bits.astype(np.uint8) + ord('0')).tobytes().decode()
+        tone, _ = cpfsk_signal(text_bits, bit_duration, sample_rate, freqs=freqs)
+        # Amplitude 0.5 / n_canais para a soma caber no pico de um canal só
+        signal[:len(tone)] += tone / len(messages)
+    
+    return signal
+
+def demodulate_fdm_signal(signal, n_channels, bit_duration=BIT_DURATION, sample_rate=SAMPLE_RATE):
+    """
+    Separa as mensagens de um sinal de generate_fdm_signal.
+    
+    Um único banco de filtros (tone_power) mede todos os tons de todos os
+    canais em cada meio bit. Cada canal decide seus bits como em
+    demodulate_manchester_signal e termina no primeiro bit sem energia. A
+    energia é medida em relação ao próprio sinal (ruído dos tons sem uso e
+    pico do canal), então o ganho do enlace não altera a decisão.
+    """
+    ts = TransmissionSystem()
+    pairs = fdm_tone_pairs(n_channels, sample_rate)
+    samples_per_bit = int(sample_rate * bit_duration)
+    half = samples_per_bit // 2
+    n_bits = len(signal) // samples_per_bit
+    bit_windows = np.asarray(signal[:n_bits * samples_per_bit], dtype=np.float64)
+    bit_windows = bit_windows.reshape(n_bits, samples_per_bit)
+    
+    # (bits, canais, [baixo, alto]) para cada metade do bit
+    freqs = pairs.reshape(-1)
+    first = tone_power(bit_windows[:, :half], freqs, sample_rate).reshape(n_bits, n_channels, 2)
+    second = tone_power(bit_windows[:, half:], freqs, sample_rate).reshape(n_bits, n_channels, 2)
+    first_high = (first[..., 1] - first[..., 0]) / half
+    second_high = (second[..., 1] - second[..., 0]) / (samples_per_bit - half)
+    bits = (first_high > second_high).astype(np.int8)
+    
+    # Em cada meio bit de um canal ativo um dos tons leva toda a energia e o
+    # outro fica só com ruído, então a mediana dos tons mais fracos estima o
+    # ruído por bin. O canal está ativo quando as duas metades do bit têm um
+    # tom bem acima do ruído e (para o silêncio sem ruído) do pico do canal.
+    halves = np.stack((first, second))
+    strong = halves.max(axis=-1)
+    noise = np.median(halves.min(axis=-1)) if halves.size else 0.0
+    peak = strong.max(axis=(0, 1), initial=0.0)
+    active = ((strong > 6 * noise) & (strong > 1e-3 * peak)).all(axis=0)
+    
+    messages = []
+    for channel in range(n_channels):
+        inactive = np.flatnonzero(~active[:, channel])
+        length = inactive[0] if len(inactive) else n_bits
+        messages.append(ts.binary_to_string(bits[:length, channel]))
+    return messages
+
 def plot_signal(signal, bits, samples_to_show=2000):
     """Plota uma parte do sinal para visualização"""
     plt.figure(figsize=(12, 4))
@@ -679,5 +880,9 @@ if __name__ == "__main__":
         save_audio(signal, output_file)
         print(f"Áudio gerado e salvo como {output_file}")
         
+        # Confere o áudio demodulando o arquivo salvo
+        _, decoded_text = decode_audio(output_file)
+        print(f"Texto demodulado do áudio: {decoded_text}")
+        
         # Mostra o gráfico
         plot_signal(signal, manchester_bits)
\ No newline at end of file
@@ -1,8 +1,94 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import List, Tuple, Dict, Callable
+from typing import List, Tuple, Dict, Callable, Iterable, Iterator, NamedTuple, Optional
 from scipy.io import wavfile
+from scipy.stats import beta
+from fractions import Fraction
 import os
+import queue
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+class Signal:
+    """
+    Sinal digital compacto usado ao longo de toda a cadeia de transmissão.
+    
+    Os valores ficam em um np.ndarray int8 (1 byte por valor, em vez de um
+    ponteiro de 8 bytes por int de uma lista Python) junto com os metadados
+    do sinal. Fatias retornam views do mesmo buffer, sem cópia. Iteração,
+    indexação e str() se comportam como a lista equivalente, de modo que o
+    código que trabalhava com List[int] continua funcionando.
+    """
+    
+    __slots__ = ("data", "method", "levels", "symbols_per_bit")
+    
+    def __init__(self, data, method: str = None, levels: Tuple[int, ...] = (0, 1),
+                 symbols_per_bit: int = 1):
+        """
+        Args:
+            data: Valores do sinal (lista, np.ndarray ou outro Signal)
+            method: Codificação de linha que gerou o sinal (None para bits puros)
+            levels: Níveis possíveis do sinal, ex.: (0, 1) ou (-1, 0, 1) para AMI
+            symbols_per_bit: Quantos valores de linha representam um bit
+        """
+        self.data = np.asarray(data, dtype=np.int8).reshape(-1)
+        self.method = method
+        self.levels = tuple(levels)
+        self.symbols_per_bit = symbols_per_bit
+    
+    def with_data(self, data) -> "Signal":
+        """Novo Signal com os mesmos metadados sobre outros valores."""
+        return Signal(data, self.method, self.levels, self.symbols_per_bit)
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __iter__(self) -> Iterator[int]:
+        return map(int, self.data)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.with_data(self.data[index])
+        return int(self.data[index])
+    
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is not None and np.dtype(dtype) != self.data.dtype:
+            return self.data.astype(dtype)
+        return self.data.copy() if copy else self.data
+    
+    def __eq__(self, other) -> bool:
+        return np.array_equal(self.data, np.asarray(other))
+    
+    def __str__(self) -> str:
+        return str(self.data.tolist())
+    
+    def __repr__(self) -> str:
+        return (f"Signal({self.data.tolist()}, method={self.method!r}, "
+                f"levels={self.levels}, symbols_per_bit={self.symbols_per_bit})")
+    
+    def copy(self) -> "Signal":
+        """Cópia independente do sinal."""
+        return self.with_data(self.data.copy())
+    
+    def tolist(self) -> List[int]:
+        """Converte para a lista de inteiros equivalente."""
+        return self.data.tolist()
+    
+    def packbits(self) -> np.ndarray:
+        """Empacota um sinal binário (níveis 0/1) em 8 valores por byte."""
+        if self.levels != (0, 1):
+            raise ValueError("Apenas sinais binários (níveis 0 e 1) podem ser empacotados")
+        return np.packbits(self.data)
+    
+    @classmethod
+    def from_packed(cls, packed: np.ndarray, length: int, method: str = None,
+                    symbols_per_bit: int = 1) -> "Signal":
+        """Reconstrói um sinal binário empacotado por `packbits`."""
+        bits = np.unpackbits(np.asarray(packed, dtype=np.uint8), count=length)
+        return cls(bits.view(np.int8), method, (0, 1), symbols_per_bit)
+
 
 class DigitalEncoder:
     """
@@ -10,6 +96,35 @@ class DigitalEncoder:
     de codificação digital.
     """
     
+    # Códigos sem estado de linha entre um bit e o seguinte
+    STATELESS_METHODS = ("Manchester", "NRZ")
+    
+    # Formatos de amostra aceitos na geração de áudio: tipo, fundo de escala
+    # e valor do silêncio (PCM de 8 bits é sem sinal, centrado em 128)
+    AUDIO_FORMATS = {
+        "float32": (np.float32, 1.0, 0),
+        "int16": (np.int16, 32767, 0),
+        "uint8": (np.uint8, 127, 128),
+    }
+    
+    # Amplitude de pico do áudio gerado, como fração do fundo de escala
+    AUDIO_PEAK = 0.9
+    
+    # Quantidade de valores de linha gerados por bit em cada código
+    SYMBOLS_PER_BIT = {
+        "Manchester": 2,
+        "NRZ": 1,
+        "NRZI": 1,
+        "AMI": 1,
+        "Biphase_Mark": 2,
+        "Biphase_Space": 2,
+        "Differential_Manchester": 2,
+    }
+
+    # Tabelas de codificação por byte, construídas sob demanda e
+    # compartilhadas entre instâncias: {método: (tabela, inversões)}
+    _byte_tables: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    
     def __init__(self):
         # Dicionário de codificações disponíveis
         self.encoding_methods = {
@@ -33,10 +148,42 @@ class DigitalEncoder:
             "Differential_Manchester": self.differential_manchester_decode,
         }
     
+        # Versões vetorizadas (NumPy) dos codificadores
+        self.vectorized_encoding_methods = {
+            "Manchester": self.manchester_encode_np,
+            "NRZ": self.nrz_encode_np,
+            "NRZI": self.nrzi_encode_np,
+            "AMI": self.ami_encode_np,
+            "Biphase_Mark": self.biphase_mark_encode_np,
+            "Biphase_Space": self.biphase_space_encode_np,
+            "Differential_Manchester": self.differential_manchester_encode_np,
+        }
+
+        # Versões vetorizadas (NumPy) dos decodificadores
+        self.vectorized_decoding_methods = {
+            "Manchester": self.manchester_decode_np,
+            "NRZ": self.nrz_decode_np,
+            "NRZI": self.nrzi_decode_np,
+            "AMI": self.ami_decode_np,
+            "Biphase_Mark": self.biphase_mark_decode_np,
+            "Biphase_Space": self.biphase_space_decode_np,
+            "Differential_Manchester": self.differential_manchester_decode_np,
+        }
+    
     def get_available_encodings(self) -> List[str]:
         """Retorna uma lista de codificações disponíveis."""
         return list(self.encoding_methods.keys())
     
+    def make_signal(self, values, method: str = None) -> Signal:
+        """
+        Envolve valores em um Signal com os metadados do método de codificação
+        (None para bits de informação).
+        """
+        if method is None:
+            return Signal(values)
+        levels = (-1, 0, 1) if method == "AMI" else (0, 1)
+        return Signal(values, method, levels, self.SYMBOLS_PER_BIT[method])
+
     # ========== Métodos de codificação ==========
     
     def manchester_encode(self, binary_data: List[int]) -> List[int]:
@@ -171,6 +318,86 @@ class DigitalEncoder:
         
         return encoded
     
+    # ========== Codificação vetorizada (NumPy) ==========
+    #
+    # Produzem exatamente os mesmos níveis dos métodos acima, mas operam sobre
+    # o array de bits inteiro de uma vez. O estado dos códigos diferenciais
+    # (variável `level` / `last_polarity`) vira um XOR acumulado. Todos operam
+    # sobre o último eixo, portanto também aceitam matrizes de mensagens.
+
+    def manchester_encode_np(self, bits: np.ndarray) -> np.ndarray:
+        """Manchester vetorizado: cada bit b vira o par (b, 1-b)."""
+        encoded = np.empty(bits.shape[:-1] + (2 * bits.shape[-1],), dtype=np.int8)
+        encoded[..., 0::2] = bits
+        encoded[..., 1::2] = 1 - bits
+        return encoded
+
+    def nrz_encode_np(self, bits: np.ndarray) -> np.ndarray:
+        """NRZ vetorizado: o nível é o próprio bit."""
+        return bits.astype(np.int8, copy=True)
+
+    def nrzi_encode_np(self, bits: np.ndarray) -> np.ndarray:
+        """NRZI vetorizado: o nível é o XOR acumulado dos bits (cada 1 inverte)."""
+        return np.bitwise_xor.accumulate(bits, axis=-1)
+
+    def ami_encode_np(self, bits: np.ndarray) -> np.ndarray:
+        """
+        AMI vetorizado: a polaridade de cada marca depende da paridade de
+        marcas já enviadas (a primeira marca é -1, a segunda +1, ...).
+        """
+        parity = np.bitwise_xor.accumulate(bits, axis=-1)
+        return bits * (1 - 2 * parity)
+
+    def _biphase_encode_np(self, toggles: np.ndarray) -> np.ndarray:
+        """
+        Base comum dos códigos bifásicos: o nível da segunda metade de cada
+        bit é o XOR acumulado de `toggles` (bits que NÃO invertem no início)
+        e a primeira metade é sempre o seu complemento.
+        """
+        second = np.bitwise_xor.accumulate(toggles, axis=-1)
+        encoded = np.empty(toggles.shape[:-1] + (2 * toggles.shape[-1],), dtype=np.int8)
+        encoded[..., 0::2] = second ^ 1
+        encoded[..., 1::2] = second
+        return encoded
+
+    def biphase_mark_encode_np(self, bits: np.ndarray) -> np.ndarray:
+        """Biphase Mark vetorizado (inversão extra no início para bit 1)."""
+        return self._biphase_encode_np(1 - bits)
+
+    def biphase_space_encode_np(self, bits: np.ndarray) -> np.ndarray:
+        """Biphase Space vetorizado (inversão extra no início para bit 0)."""
+        return self._biphase_encode_np(bits)
+
+    def differential_manchester_encode_np(self, bits: np.ndarray) -> np.ndarray:
+        """
+        Manchester Diferencial vetorizado. Com a convenção usada em
+        `differential_manchester_encode` os níveis coincidem com Biphase Mark.
+        """
+        return self._biphase_encode_np(1 - bits)
+
+    def _with_line_state(self, method: str, encoded: np.ndarray, state: int) -> np.ndarray:
+        """
+        Converte níveis gerados a partir do estado de linha 0 (nível inicial 0
+        ou última polaridade +1) para os níveis equivalentes partindo de `state`.
+        """
+        if not state or method in self.STATELESS_METHODS:
+            return encoded
+        if method == "AMI":
+            return -encoded
+        return encoded ^ 1
+
+    def _line_state_toggle(self, method: str, bits: np.ndarray, encoded: np.ndarray) -> np.ndarray:
+        """
+        Indica (0 ou 1, pelo último eixo) se um bloco de bits troca o estado de
+        linha, dado `encoded`, o mesmo bloco codificado a partir do estado 0.
+        """
+        if method in self.STATELESS_METHODS or bits.shape[-1] == 0:
+            return np.zeros(bits.shape[:-1], dtype=np.int8)
+        if method == "AMI":
+            return np.bitwise_xor.reduce(bits, axis=-1)
+        # Códigos de dois níveis: o nível final é a própria inversão
+        return encoded[..., -1].copy()
+    
     # ========== Métodos de decodificação ==========
     
     def manchester_decode(self, encoded_data: List[int]) -> List[int]:
@@ -286,42 +513,229 @@ class DigitalEncoder:
             i += 2  # Avança para o próximo símbolo
         
         return decoded
+
+    # ========== Codificação por tabela de bytes ==========
+
+    def byte_lookup_table(self, method: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna as tabelas usadas por `encode_bytes` (construídas uma única vez).
+
+        A tabela tem formato (estados, 256, símbolos por byte): tabela[e, b]
+        são os níveis gerados pelos 8 bits do byte b partindo do estado de
+        linha e. O estado 0 é o estado inicial dos codificadores (nível 0 ou
+        última polaridade +1) e o estado 1 o oposto; códigos sem estado têm
+        apenas o estado 0. inversoes[b] vale 1 quando o byte b troca o estado.
+
+        Args:
+            method: Método de codificação
+
+        Returns:
+            Tupla (tabela, inversoes)
+        """
+        if method not in self.vectorized_encoding_methods:
+            raise ValueError(f"Método de codificação '{method}' não implementado")
+
+        if method not in self._byte_tables:
+            all_bytes = np.arange(256, dtype=np.uint8)[:, np.newaxis]
+            bits = np.unpackbits(all_bytes, axis=1).astype(np.int8)
+            base = self.vectorized_encoding_methods[method](bits)
+
+            if method in self.STATELESS_METHODS:
+                table = base[np.newaxis]
+            else:
+                table = np.stack([base, self._with_line_state(method, base, 1)])
+            toggles = self._line_state_toggle(method, bits, base)
+
+            self._byte_tables[method] = (table, toggles)
+
+        return self._byte_tables[method]
+
+    def encode_bytes(self, data: bytes, method: str = "Manchester") -> Signal:
+        """
+        Codifica uma sequência de bytes diretamente, sem passar por uma lista de bits.
+
+        Cada byte é uma consulta à tabela de `byte_lookup_table`; o estado de
+        entrada de cada byte é encadeado como o XOR acumulado das inversões
+        dos bytes anteriores. O resultado é idêntico a
+        `encode(bits, method, vectorized=True)` sobre os bits MSB primeiro.
+
+        Args:
+            data: Bytes a codificar (bytes, bytearray, memoryview ou array uint8)
+            method: Método de codificação a ser utilizado
+
+        Returns:
+            Signal com os valores codificados
+        """
+        table, toggles = self.byte_lookup_table(method)
+        if isinstance(data, np.ndarray):
+            values = data.astype(np.uint8, copy=False).ravel()
+        else:
+            values = np.frombuffer(data, dtype=np.uint8)
+
+        if table.shape[0] == 1:
+            return self.make_signal(table[0][values], method)
+
+        byte_toggles = toggles[values]
+        states = np.bitwise_xor.accumulate(byte_toggles) ^ byte_toggles
+        return self.make_signal(table[states, values], method)
+
+    # ========== Decodificação vetorizada (NumPy) ==========
+    #
+    # Cada decodificador retorna (bits, invalidos): `invalidos` é um array com
+    # os índices dos símbolos que violam o código, no lugar dos prints da
+    # versão em laço. Os códigos diferenciais comparam cada símbolo com o
+    # anterior através de fatias deslocadas, partindo do mesmo nível inicial
+    # do codificador (0); assim o primeiro bit também é recuperado.
+
+    def _symbol_halves(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Separa um sinal de dois níveis por bit em (primeiras, segundas) metades."""
+        n_symbols = encoded.shape[-1] // 2
+        pairs = encoded[..., :2 * n_symbols].reshape(encoded.shape[:-1] + (n_symbols, 2))
+        return pairs[..., 0], pairs[..., 1]
+
+    def _previous(self, values: np.ndarray, initial: int) -> np.ndarray:
+        """Desloca `values` uma posição para a direita, preenchendo com `initial`."""
+        previous = np.empty_like(values)
+        if values.shape[-1]:
+            previous[..., 0] = initial
+            previous[..., 1:] = values[..., :-1]
+        return previous
+
+    def manchester_decode_np(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Manchester vetorizado: o sinal é visto como uma matriz (N, 2). Só os
+        pares (0, 1) e (1, 0) são válidos; como na versão em laço, um par
+        inválido repete o último bit válido (ou 0 no início) e o resultado é
+        completado com zeros até um múltiplo de 8 bits.
+        """
+        first, second = self._symbol_halves(encoded)
+        valid = (first + second) == 1
+        
+        # Índice do último par válido até cada posição (-1 se nenhum)
+        last_valid = np.where(valid, np.arange(valid.shape[-1]), -1)
+        last_valid = np.maximum.accumulate(last_valid, axis=-1)
+        filled = np.take_along_axis(first, np.maximum(last_valid, 0), axis=-1)
+        
+        padding = -valid.shape[-1] % 8
+        decoded = np.zeros(valid.shape[:-1] + (valid.shape[-1] + padding,), dtype=np.int8)
+        decoded[..., :valid.shape[-1]] = np.where(last_valid >= 0, filled, 0)
+        return decoded, np.flatnonzero(~valid)
+
+    def nrz_decode_np(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """NRZ vetorizado: o bit é o próprio nível."""
+        return encoded.astype(np.int8, copy=True), np.empty(0, dtype=np.intp)
+
+    def nrzi_decode_np(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """NRZI vetorizado: bit 1 onde o nível difere do anterior."""
+        decoded = (encoded != self._previous(encoded, 0)).astype(np.int8)
+        return decoded, np.empty(0, dtype=np.intp)
+
+    def ami_decode_np(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        AMI vetorizado: qualquer nível diferente de zero é bit 1. Marcas com a
+        mesma polaridade da marca anterior (violação bipolar) são reportadas.
+        Em sinais 2-D cada linha é uma mensagem independente.
+        """
+        marks = encoded != 0
+        
+        # Polaridade da marca anterior a cada posição, na mesma linha (+1 se nenhuma)
+        last_mark = np.where(marks, np.arange(encoded.shape[-1]), -1)
+        last_mark = self._previous(np.maximum.accumulate(last_mark, axis=-1), -1)
+        previous = np.take_along_axis(encoded, np.maximum(last_mark, 0), axis=-1)
+        previous = np.where(last_mark >= 0, previous, 1)
+        
+        violations = np.flatnonzero(marks & (encoded == previous))
+        return marks.astype(np.int8), violations
+
+    def biphase_mark_decode_np(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Biphase Mark vetorizado: bit 1 quando há transição entre o fim do
+        símbolo anterior e o início do atual. Símbolos sem a transição do
+        meio do bit são reportados como inválidos.
+        """
+        first, second = self._symbol_halves(encoded)
+        decoded = (first != self._previous(second, 0)).astype(np.int8)
+        return decoded, np.flatnonzero(first == second)
+
+    def biphase_space_decode_np(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Biphase Space vetorizado: bit 0 quando há transição no início do símbolo."""
+        first, second = self._symbol_halves(encoded)
+        decoded = (first == self._previous(second, 0)).astype(np.int8)
+        return decoded, np.flatnonzero(first == second)
+
+    def differential_manchester_decode_np(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Manchester Diferencial vetorizado: com a convenção do codificador, o
+        bit é 1 quando o símbolo começa invertido em relação ao fim do
+        anterior (mesma regra de Biphase Mark).
+        """
+        return self.biphase_mark_decode_np(encoded)
     
     # ========== Funções principais ==========
     
-    def encode(self, binary_data: List[int], method: str = "Manchester") -> List[int]:
+    def encode(self, binary_data: Signal, method: str = "Manchester",
+               vectorized: bool = True) -> Signal:
         """
         Codifica dados binários usando o método especificado.
         
         Args:
-            binary_data: Lista de bits (0s e 1s) para codificar
+            binary_data: Bits (0s e 1s) para codificar (Signal, lista ou array)
             method: Método de codificação a ser utilizado
+            vectorized: Se True, usa o motor NumPy; se False, os métodos em laço
             
         Returns:
-            Lista de valores codificados
+            Signal com os valores codificados
         """
         if method not in self.encoding_methods:
             raise ValueError(f"Método de codificação '{method}' não implementado")
         
-        return self.encoding_methods[method](binary_data)
+        if vectorized:
+            bits = np.asarray(binary_data, dtype=np.int8)
+            return self.make_signal(self.vectorized_encoding_methods[method](bits), method)
+        
+        return self.make_signal(self.encoding_methods[method](binary_data), method)
     
-    def decode(self, encoded_data: List[int], method: str = "Manchester") -> List[int]:
+    def decode(self, encoded_data: Signal, method: str = "Manchester",
+               vectorized: bool = True, return_invalid: bool = False) -> Signal:
         """
         Decodifica dados codificados usando o método especificado.
         
         Args:
-            encoded_data: Lista de valores codificados
+            encoded_data: Valores codificados (Signal, lista ou array)
             method: Método de decodificação a ser utilizado
+            vectorized: Se True, usa o motor NumPy; se False, os métodos em laço
+            return_invalid: Se True (apenas com vectorized), retorna também o
+                array de índices dos símbolos inválidos
             
         Returns:
-            Lista de bits (0s e 1s) decodificados
+            Signal com os bits (0s e 1s) decodificados, ou a tupla
+            (bits, índices inválidos) quando return_invalid=True
         """
         if method not in self.decoding_methods:
             raise ValueError(f"Método de decodificação '{method}' não implementado")
         
-        return self.decoding_methods[method](encoded_data)
+        if vectorized:
+            encoded = np.asarray(encoded_data, dtype=np.int8)
+            decoded, invalid = self.vectorized_decoding_methods[method](encoded)
+            decoded = self.make_signal(decoded)
+            return (decoded, invalid) if return_invalid else decoded
+        
+        return self.make_signal(self.decoding_methods[method](encoded_data))
     
-    def visualize_waveform(self, data: List[int], method: str = None, title: str = None) -> None:
+    def stream_encoder(self, method: str = "Manchester") -> "StreamEncoder":
+        """Cria um codificador incremental (por blocos) para o método especificado."""
+        return StreamEncoder(method, self)
+    
+    def stream_decoder(self, method: str = "Manchester") -> "StreamDecoder":
+        """Cria um decodificador incremental (por blocos) para o método especificado."""
+        return StreamDecoder(method, self)
+    
+    def realtime_stream(self, chunks: Iterable[Signal], method: str = None,
+                        **options) -> "RealtimeAudioStream":
+        """Cria um gerador de blocos PCM em tempo real (ver RealtimeAudioStream)."""
+        return RealtimeAudioStream(chunks, method, encoder=self, **options)
+    
+    def visualize_waveform(self, data: Signal, method: str = None, title: str = None) -> None:
         """
         Visualiza os dados como forma de onda digital.
         
@@ -363,118 +777,1514 @@ class DigitalEncoder:
         plt.tight_layout()
         plt.show()
     
-    def save_audio_waveform(self, data: List[int], filename: str = "digital_signal.wav", 
-                           sample_rate: int = 44100, bit_rate: int = 300) -> str:
+    def level_amplitudes(self, sample_format: str = "float32", peak: float = AUDIO_PEAK) -> np.ndarray:
+        """
+        Amplitudes de áudio dos níveis -1, 0 e 1 (nessa ordem) já quantizadas
+        no tipo de amostra de `sample_format`, com o nível 1 em `peak`.
+        """
+        if sample_format not in self.AUDIO_FORMATS:
+            raise ValueError(f"Formato de áudio '{sample_format}' não suportado")
+        
+        dtype, full_scale, zero = self.AUDIO_FORMATS[sample_format]
+        amplitudes = np.array([-1.0, 0.0, 1.0]) * peak * full_scale
+        if np.issubdtype(dtype, np.integer):
+            amplitudes = np.round(amplitudes)
+        return (amplitudes + zero).astype(dtype)
+    
+    def samples_per_bit(self, sample_rate: float, bit_rate: float) -> Fraction:
+        """
+        Duração exata de um valor de linha em amostras, como fração
+        (ex.: 44100 / 9600 = 147/32), sem o truncamento para inteiro.
+        """
+        samples = Fraction(sample_rate) / Fraction(bit_rate)
+        if samples < 1:
+            raise ValueError("A taxa de bits não pode passar da taxa de amostragem")
+        return samples
+    
+    def symbol_edges(self, first_symbol: int, n_symbols: int, samples_per_bit) -> np.ndarray:
+        """
+        Posição (em amostras) do início dos símbolos first_symbol até
+        first_symbol + n_symbols, inclusive, calculadas de uma vez.
+        
+        O símbolo k começa em ceil(k * samples_per_bit): a amostra j pertence
+        ao símbolo floor(j / samples_per_bit), então o erro de tempo nunca
+        passa de uma amostra e não se acumula ao longo do sinal.
+        """
+        step = Fraction(samples_per_bit).limit_denominator(1 << 20)
+        k = np.arange(first_symbol, first_symbol + n_symbols + 1, dtype=np.int64)
+        return -((-k * step.numerator) // step.denominator)
+    
+    def render_waveform(self, data: Signal, samples_per_bit,
+                        sample_format: str = "float32", first_symbol: int = 0) -> np.ndarray:
+        """
+        Gera as amostras de áudio de um sinal codificado.
+        
+        Cada valor (-1, 0 ou 1) vira um pulso retangular de `samples_per_bit`
+        amostras, escrito por broadcast em um buffer pré-alocado. O pico fica
+        em AUDIO_PEAK do fundo de escala sempre que houver algum nível não nulo.
+        
+        Se `samples_per_bit` não for inteiro, os pulsos seguem `symbol_edges`
+        (alguns têm uma amostra a mais); `first_symbol` indica a posição do
+        primeiro valor no fluxo, para gerar um sinal longo em blocos.
+        
+        Args:
+            data: Valores de sinal codificado (0s, 1s ou -1s para AMI)
+            samples_per_bit: Amostras de áudio por valor de linha (int, Fraction ou float)
+            sample_format: Formato das amostras (ver AUDIO_FORMATS)
+            first_symbol: Índice do primeiro valor no fluxo completo
+            
+        Returns:
+            np.ndarray com as amostras no tipo de `sample_format`
+        """
+        values = np.asarray(data, dtype=np.int8)
+        amplitudes = self.level_amplitudes(sample_format)
+        
+        step = Fraction(samples_per_bit).limit_denominator(1 << 20)
+        if step.denominator != 1:
+            lengths = np.diff(self.symbol_edges(first_symbol, len(values), step))
+            return np.repeat(amplitudes[values + 1], lengths)
+        
+        audio = np.empty((len(values), step.numerator), dtype=amplitudes.dtype)
+        audio[...] = amplitudes[values + 1][:, np.newaxis]
+        return audio.reshape(-1)
+    
+    def save_audio_waveform(self, data: Signal, filename: str = "digital_signal.wav", 
+                           sample_rate: int = 44100, bit_rate: int = 300,
+                           sample_format: str = "float32", raw: bool = False) -> str:
         """
         Converte sinal digital codificado em arquivo de áudio WAV.
         
+        As amostras já saem no tipo final (ver `level_amplitudes`), sem passar
+        por um buffer em ponto flutuante. Para códigos de dois níveis, "uint8"
+        ocupa um quarto do espaço de "float32" e, como "int16", abre no módulo
+        `wave` da biblioteca padrão.
+        
         Args:
-            data: Lista de valores de sinal codificado (0s, 1s ou -1s para AMI)
+            data: Valores de sinal codificado (0s, 1s ou -1s para AMI)
             filename: Nome do arquivo de saída
             sample_rate: Taxa de amostragem em Hz
             bit_rate: Taxa de bits por segundo
+            sample_format: "float32" (padrão), "int16" ou "uint8" (ver AUDIO_FORMATS)
+            raw: Se True, grava só as amostras (PCM cru, sem cabeçalho WAV)
             
         Returns:
             Caminho para o arquivo de áudio salvo
         """
-        # Determinar amostras por bit
-        samples_per_bit = int(sample_rate / bit_rate)
+        # Determinar amostras por bit (fração exata, sem truncar)
+        samples_per_bit = self.samples_per_bit(sample_rate, bit_rate)
         
-        # Expandir cada bit do sinal para várias amostras
-        audio_signal = []
-        for value in data:
-            # Converter o valor digital (-1, 0, 1) para uma amplitude de áudio (-0.5, 0, 0.5)
-            # Multiplica por 0.5 para evitar clipping
-            amplitude = float(value) * 0.5
+        # Expandir cada valor do sinal em um pulso de samples_per_bit amostras
+        audio_array = self.render_waveform(data, samples_per_bit, sample_format)
+        
+        # Salvar como arquivo WAV (ou apenas as amostras)
+        if raw:
+            audio_array.tofile(filename)
+        else:
+            wavfile.write(filename, sample_rate, audio_array)
+        
+        # Retornar o caminho absoluto do arquivo salvo
+        return os.path.abspath(filename)
+    
+    def audio_to_float(self, samples: np.ndarray) -> np.ndarray:
+        """Converte amostras lidas de um WAV (mono ou 1º canal) para float na escala [-1, 1]."""
+        samples = np.asarray(samples)
+        if samples.ndim > 1:
+            samples = samples[:, 0]
+        if samples.dtype == np.uint8:
+            return (samples.astype(np.float32) - 128) / 127
+        if np.issubdtype(samples.dtype, np.integer):
+            return samples.astype(np.float32) / np.iinfo(samples.dtype).max
+        return samples.astype(np.float32, copy=False)
+    
+    def integrate_and_dump(self, samples: np.ndarray, samples_per_bit: int) -> np.ndarray:
+        """Média de cada janela de `samples_per_bit` amostras (sobra final descartada)."""
+        n_symbols = len(samples) // samples_per_bit
+        windows = samples[:n_symbols * samples_per_bit].reshape(n_symbols, samples_per_bit)
+        return windows.mean(axis=1, dtype=np.float64)
+    
+    def integrate_symbols(self, samples: np.ndarray, edges: np.ndarray) -> np.ndarray:
+        """Média das amostras entre cada par de bordas consecutivas de `symbol_edges`."""
+        starts = edges[:-1] - edges[0]
+        if not len(starts):
+            return np.empty(0)
+        sums = np.add.reduceat(np.asarray(samples, dtype=np.float64), starts)
+        return sums / np.diff(edges)
+    
+    def _level_clusters(self, values: np.ndarray) -> Optional[Tuple[float, float]]:
+        """
+        Separa `values` em dois grupos (limiar iterativo no meio das médias,
+        começando entre o mínimo e o máximo) e retorna a média de cada um.
+        
+        Como o limiar vem das médias e não de percentis, poucos valores no
+        nível alto (ex.: 0.1% de marcas) ainda formam o seu grupo. Retorna None
+        se os dados não tiverem dois níveis distintos: grupos próximos demais
+        (menos de 0.1 * AUDIO_PEAK) ou pouco separados em relação à dispersão
+        dentro de cada grupo, como acontece ao dividir ruído puro.
+        """
+        if len(values) < 2:
+            return None
+        
+        threshold = (values.min() + values.max()) / 2
+        for _ in range(32):
+            high = values > threshold
+            if high.all() or not high.any():
+                return None
+            low_mean, high_mean = values[~high].mean(), values[high].mean()
+            updated = (low_mean + high_mean) / 2
+            if abs(updated - threshold) < 1e-9:
+                break
+            threshold = updated
+        
+        spread = np.sqrt((np.var(values[~high]) * (~high).sum() + np.var(values[high]) * high.sum())
+                         / len(values))
+        separation = high_mean - low_mean
+        if separation < 0.1 * self.AUDIO_PEAK or separation < 3.5 * spread:
+            return None
+        return low_mean, high_mean
+    
+    def level_thresholds(self, values: np.ndarray, ternary: bool = False) -> np.ndarray:
+        """
+        Estima, a partir dos próprios dados, os limiares de decisão entre os
+        níveis de linha (um limiar para 0/1, dois para -1/0/1 se `ternary`).
+        
+        Para dois níveis o limiar fica no meio entre as médias dos dois grupos
+        de `_level_clusters`. Para AMI os limiares ficam em ±metade da
+        amplitude das marcas, medida no grupo alto de |valores|, então poucas
+        marcas continuam sendo marcas. Sem dois níveis distintos (sinal
+        constante, todo zero ou todo marcas) usa metade do pico nominal AUDIO_PEAK.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        
+        if ternary:
+            clusters = self._level_clusters(np.abs(values))
+            peak = clusters[1] if clusters is not None else self.AUDIO_PEAK
+            return np.array([-peak / 2, peak / 2])
+        
+        clusters = self._level_clusters(values)
+        threshold = sum(clusters) / 2 if clusters is not None else self.AUDIO_PEAK / 2
+        return np.array([threshold])
+    
+    def slice_levels(self, values: np.ndarray, ternary: bool = False,
+                     thresholds: np.ndarray = None) -> np.ndarray:
+        """
+        Decide o nível de linha (0/1, ou -1/0/1 se `ternary`) de cada valor
+        integrado. Sem `thresholds`, os limiares vêm de `level_thresholds`.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if thresholds is None:
+            thresholds = self.level_thresholds(values, ternary)
+        
+        levels = np.searchsorted(thresholds, values).astype(np.int8)
+        return levels - 1 if ternary else levels
+    
+    def recover_symbol_timing(self, samples: np.ndarray, samples_per_symbol: float,
+                              ternary: bool = False, block_symbols: int = 128) -> np.ndarray:
+        """
+        Estima o centro (em amostras) de cada símbolo de um sinal de áudio
+        cuja taxa de amostragem pode ter derivado em relação à nominal.
+        
+        Atalho para um SymbolTimingRecovery sobre o sinal inteiro.
+        
+        Args:
+            samples: Amostras de áudio em ponto flutuante
+            samples_per_symbol: Duração nominal de um símbolo, em amostras
+            ternary: Se True, o sinal tem três níveis (AMI)
+            block_symbols: Símbolos por bloco do laço de rastreamento
             
-            # Repetir o valor para criar um pulso com duração adequada
-            audio_signal.extend([amplitude] * samples_per_bit)
+        Returns:
+            np.ndarray (float) com a posição do centro de cada símbolo
+        """
+        recovery = SymbolTimingRecovery(samples_per_symbol, ternary, block_symbols, encoder=self)
+        centers, _ = recovery.process(samples, final=True)
+        return centers
+    
+    def load_audio_waveform(self, filename: str, bit_rate: int = 300, method: str = None,
+                            symbols_per_window: int = 4096, timing_recovery: bool = False,
+                            raw_format: str = None, sample_rate: int = 44100) -> Signal:
+        """
+        Lê um WAV gerado por `save_audio_waveform` e recupera o sinal codificado.
+        
+        O arquivo é mapeado em memória (WavReader) e processado em janelas de
+        símbolos inteiros. Cada símbolo de `samples_per_bit` amostras é
+        integrado (média) e o resultado é fatiado nos níveis de linha
+        estimados, tudo vetorizado. O Signal retornado pode ir direto para `decode`.
         
-        # Converter para array numpy
-        audio_array = np.array(audio_signal, dtype=np.float32)
+        Com `timing_recovery`, os símbolos não seguem a grade fixa: um
+        SymbolTimingRecovery acompanha as transições e integra a metade
+        central de cada símbolo, tolerando deriva do relógio de amostragem.
         
-        # Normalizar entre -1 e 1 para evitar clipping
-        if np.max(np.abs(audio_array)) > 0:
-            audio_array = audio_array / np.max(np.abs(audio_array)) * 0.9
+        Args:
+            filename: Arquivo WAV de entrada
+            bit_rate: Taxa de bits por segundo usada na geração
+            method: Método de codificação (define os níveis; None = inferir)
+            symbols_per_window: Símbolos lidos do arquivo por janela
+            timing_recovery: Se True, recupera o relógio de símbolo do próprio sinal
+            raw_format: Formato das amostras se o arquivo for PCM cru (sem cabeçalho)
+            sample_rate: Taxa de amostragem do PCM cru (ignorada para WAV)
+            
+        Returns:
+            Signal com os valores de linha recuperados
+        """
+        ternary = method == "AMI" if method is not None else None
         
-        # Salvar como arquivo WAV
-        wavfile.write(filename, sample_rate, audio_array)
+        with WavReader(filename, raw_format, sample_rate) as reader:
+            samples_per_bit = self.samples_per_bit(reader.sample_rate, bit_rate)
+            parts = [np.empty(0)]
+            if timing_recovery:
+                recovery = None
+                window = int(samples_per_bit * symbols_per_window)
+                for _, block in reader.windows(window):
+                    block = self.audio_to_float(block)
+                    if recovery is None:
+                        if ternary is None:
+                            ternary = bool(len(block)) and block.min() < -self.AUDIO_PEAK / 2
+                        recovery = SymbolTimingRecovery(float(samples_per_bit), ternary, encoder=self)
+                    parts.append(recovery.process(block)[1])
+                if recovery is not None:
+                    parts.append(recovery.process(np.empty(0), final=True)[1])
+            elif samples_per_bit.denominator == 1:
+                samples_per_bit = samples_per_bit.numerator
+                for _, block in reader.symbol_windows(samples_per_bit, symbols_per_window):
+                    parts.append(self.integrate_and_dump(self.audio_to_float(block), samples_per_bit))
+            else:
+                # Símbolos de duração fracionária: bordas exatas de symbol_edges
+                n_symbols = len(reader) * samples_per_bit.denominator // samples_per_bit.numerator
+                for first in range(0, n_symbols, symbols_per_window):
+                    count = min(symbols_per_window, n_symbols - first)
+                    edges = self.symbol_edges(first, count, samples_per_bit)
+                    block = self.audio_to_float(reader.samples[edges[0]:edges[-1]])
+                    parts.append(self.integrate_symbols(block, edges))
+        integrated = np.concatenate(parts)
+        
+        if ternary is None:
+            # Valores claramente negativos só aparecem no AMI
+            ternary = bool(len(integrated)) and integrated.min() < -self.AUDIO_PEAK / 2
+        
+        values = self.slice_levels(integrated, ternary)
+        if method is not None:
+            return self.make_signal(values, method)
+        return Signal(values, levels=(-1, 0, 1) if ternary else (0, 1))
+    
+    def _moving_average(self, values: np.ndarray, width: int) -> np.ndarray:
+        """Média de cada janela de `width` valores, alinhada ao início da janela."""
+        sums = np.concatenate(([0.0], np.cumsum(values)))
+        return (sums[width:] - sums[:-width]) / width
+    
+    def find_preamble(self, filename: str, preamble: Signal, bit_rate: int = 300,
+                      threshold: float = 0.85, window_samples: int = 1 << 16,
+                      min_spacing: int = None) -> np.ndarray:
+        """
+        Localiza as ocorrências de um preâmbulo em uma gravação WAV.
+        
+        A forma de onda do preâmbulo é correlacionada com o áudio via FFT pelo
+        método overlap-save: o arquivo é lido em janelas de `nfft` amostras que
+        se sobrepõem no tamanho do preâmbulo menos uma, e cada janela custa
+        uma FFT direta e uma inversa (O(N log N) no total). Antes, áudio e
+        preâmbulo passam por uma média móvel de um valor de linha (filtro
+        casado do pulso retangular), que remove o ruído fora da banda do
+        sinal. A correlação é normalizada pela energia local do sinal
+        filtrado, de modo que o limiar não depende do volume da gravação.
+        
+        Args:
+            filename: Arquivo WAV a ser examinado
+            preamble: Signal com os valores de linha do preâmbulo já codificado
+            bit_rate: Taxa de bits por segundo usada na geração
+            threshold: Correlação normalizada mínima (0 a 1) para uma detecção
+            window_samples: Tamanho mínimo da janela de FFT, em amostras
+            min_spacing: Distância mínima, em valores de linha, entre o início
+                de dois preâmbulos (ex.: o tamanho do menor quadro). Detecções
+                mais próximas de um início já aceito são ignoradas. O padrão é
+                o tamanho do próprio preâmbulo.
+            
+        Returns:
+            np.ndarray com a posição (em amostras) do início de cada preâmbulo
+        """
+        with WavReader(filename) as reader:
+            samples_per_bit = self.samples_per_bit(reader.sample_rate, bit_rate)
+            width = max(int(samples_per_bit), 1)
+            waveform = self.render_waveform(preamble, samples_per_bit).astype(np.float64)
+            span = len(waveform)
+            if span < width or len(reader) < span:
+                return np.empty(0, dtype=np.int64)
+            template = self._moving_average(waveform, width)
+            template -= template.mean()
+            template_norm = np.sqrt(np.dot(template, template))
+            size = len(template)
+            if template_norm == 0:
+                return np.empty(0, dtype=np.int64)
+            
+            nfft = 1 << int(np.ceil(np.log2(max(window_samples, 2 * span))))
+            template_fft = np.conj(np.fft.rfft(template, nfft))
+            
+            positions, scores = [np.empty(0, dtype=np.int64)], [np.empty(0)]
+            for offset, block in reader.windows(nfft, span - 1):
+                if len(block) < span:
+                    continue
+                block = self._moving_average(self.audio_to_float(block).astype(np.float64), width)
+                lags = len(block) - size + 1
+                if lags <= 0:
+                    continue
+                # Só os primeiros `lags` valores não sofrem com a correlação circular
+                correlation = np.fft.irfft(np.fft.rfft(block, nfft) * template_fft, nfft)[:lags]
+                
+                # Energia do sinal (sem a média) em cada janela do tamanho do preâmbulo
+                sums = np.concatenate(([0.0], np.cumsum(block)))
+                squares = np.concatenate(([0.0], np.cumsum(block * block)))
+                local_sum = sums[size:size + lags] - sums[:lags]
+                energy = squares[size:size + lags] - squares[:lags] - local_sum ** 2 / size
+                score = correlation / (template_norm * np.sqrt(np.maximum(energy, 1e-12)))
+                
+                hits = np.flatnonzero(score >= threshold)
+                positions.append(offset + hits)
+                scores.append(score[hits])
+        
+        positions, scores = np.concatenate(positions), np.concatenate(scores)
+        if not len(positions):
+            return positions
+        
+        # Detecções a menos de um preâmbulo de distância são o mesmo pico:
+        # fica apenas a de maior correlação de cada grupo
+        groups = np.concatenate(([0], np.cumsum(np.diff(positions) >= span)))
+        order = np.lexsort((-scores, groups))
+        first = np.concatenate(([True], groups[order][1:] != groups[order][:-1]))
+        peaks = positions[order][first]
+        
+        # Em ordem de posição, descarta picos que caem dentro de um quadro já aceito
+        spacing = span if min_spacing is None else int(np.ceil(float(min_spacing * samples_per_bit)))
+        accepted = [peaks[0]]
+        for position in peaks[1:]:
+            if position - accepted[-1] >= spacing:
+                accepted.append(position)
+        return np.array(accepted, dtype=np.int64)
+    
+    def stream_audio_waveform(self, chunks: Iterable[Signal], filename: str = "digital_signal.wav",
+                              sample_rate: int = 44100, bit_rate: int = 300, method: str = None,
+                              sample_format: str = "int16", queue_blocks: int = 4,
+                              raw: bool = False) -> str:
+        """
+        Converte um fluxo de blocos em arquivo WAV sem manter o sinal inteiro na memória.
+        
+        Cada bloco vira áudio com `render_waveform`, que usa o pico fixo
+        AUDIO_PEAK em vez de normalizar pelo máximo global, e é gravado por
+        um WavStreamWriter. Com queue_blocks > 0 a escrita em disco acontece
+        em uma thread separada, em paralelo com a codificação.
+        
+        Args:
+            chunks: Blocos de sinal codificado, ou blocos de bits se `method` for informado
+            filename: Nome do arquivo de saída
+            sample_rate: Taxa de amostragem em Hz
+            bit_rate: Taxa de bits por segundo
+            method: Se informado, os blocos são codificados por um StreamEncoder deste método
+            sample_format: Formato das amostras (ver AUDIO_FORMATS)
+            queue_blocks: Blocos que podem aguardar escrita (0 = escrita síncrona)
+            raw: Se True, grava só as amostras (PCM cru, sem cabeçalho WAV)
+            
+        Returns:
+            Caminho para o arquivo de áudio salvo
+        """
+        samples_per_bit = self.samples_per_bit(sample_rate, bit_rate)
+        stream = self.stream_encoder(method) if method is not None else None
+        
+        with WavStreamWriter(filename, sample_rate, sample_format, queue_blocks=queue_blocks,
+                             raw=raw) as writer:
+            symbols_written = 0
+            for chunk in chunks:
+                if stream is not None:
+                    chunk = stream.encode(chunk)
+                writer.write(self.render_waveform(chunk, samples_per_bit, sample_format, symbols_written))
+                symbols_written += len(chunk)
         
-        # Retornar o caminho absoluto do arquivo salvo
         return os.path.abspath(filename)
 
 
+class WavStreamWriter:
+    """
+    Escreve um arquivo WAV mono bloco a bloco, com memória constante.
+    
+    O cabeçalho RIFF é gravado com tamanhos provisórios e corrigido em
+    `close()`. Blocos no tipo de amostra do formato são gravados como estão;
+    blocos em ponto flutuante são escalados considerando `peak` como a
+    amplitude máxima conhecida do produtor, sem normalização global.
+    Com raw=True não há cabeçalho: o arquivo é só o PCM.
+    """
+    
+    # Códigos de formato do chunk "fmt " (WAVE_FORMAT_PCM / WAVE_FORMAT_IEEE_FLOAT)
+    PCM_FORMAT = 1
+    FLOAT_FORMAT = 3
+    
+    def __init__(self, filename: str, sample_rate: int = 44100, sample_format: str = "int16",
+                 peak: float = 1.0, queue_blocks: int = 0, raw: bool = False):
+        """
+        Args:
+            filename: Caminho do arquivo de saída
+            sample_rate: Taxa de amostragem em Hz
+            sample_format: Formato das amostras (ver DigitalEncoder.AUDIO_FORMATS)
+            peak: Amplitude máxima dos blocos em ponto flutuante recebidos
+            queue_blocks: Blocos que podem aguardar escrita em uma thread
+                separada (0 = escrita síncrona em `write`)
+            raw: Se True, grava PCM cru, sem cabeçalho WAV
+        """
+        if sample_format not in DigitalEncoder.AUDIO_FORMATS:
+            raise ValueError(f"Formato de áudio '{sample_format}' não suportado")
+        
+        self.dtype, self.full_scale, self.zero = DigitalEncoder.AUDIO_FORMATS[sample_format]
+        self.dtype = np.dtype(self.dtype)
+        self.sample_rate = sample_rate
+        self.peak = peak
+        self.raw = raw
+        self.frames_written = 0
+        
+        self.file = open(filename, "wb")
+        if not raw:
+            self._write_header()
+        
+        # Escrita opcional em segundo plano
+        self._queue = None
+        self._thread = None
+        self._error = None
+        if queue_blocks > 0:
+            self._queue = queue.Queue(maxsize=queue_blocks)
+            self._thread = threading.Thread(target=self._drain_queue, daemon=True)
+            self._thread.start()
+    
+    def _write_header(self) -> None:
+        """Grava o cabeçalho com tamanhos zerados, guardando as posições a corrigir."""
+        is_float = self.dtype.kind == "f"
+        sample_bytes = self.dtype.itemsize
+        
+        fmt = struct.pack("<HHIIHH", self.FLOAT_FORMAT if is_float else self.PCM_FORMAT, 1,
+                          self.sample_rate, self.sample_rate * sample_bytes,
+                          sample_bytes, 8 * sample_bytes)
+        if is_float:
+            # Formatos não-PCM levam cbSize no "fmt " e um chunk "fact"
+            fmt += struct.pack("<H", 0)
+        
+        header = b"RIFF" + struct.pack("<I", 0) + b"WAVE"
+        header += b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        self._fact_offset = None
+        if is_float:
+            self._fact_offset = len(header) + 8
+            header += b"fact" + struct.pack("<II", 4, 0)
+        self._data_offset = len(header) + 4
+        header += b"data" + struct.pack("<I", 0)
+        self.file.write(header)
+    
+    def _to_samples(self, block: np.ndarray) -> np.ndarray:
+        """Converte um bloco para o tipo de amostra do arquivo."""
+        block = np.asarray(block)
+        if block.dtype == self.dtype:
+            return block
+        scaled = block / self.peak * self.full_scale + self.zero
+        if self.dtype.kind != "f":
+            info = np.iinfo(self.dtype)
+            scaled = np.clip(scaled, info.min, info.max)
+        return scaled.astype(self.dtype)
+    
+    def write(self, block: np.ndarray) -> None:
+        """Acrescenta um bloco de amostras ao arquivo."""
+        samples = self._to_samples(block).reshape(-1)
+        self.frames_written += len(samples)
+        
+        if self._queue is None:
+            self.file.write(samples.tobytes())
+            return
+        
+        if self._error is not None:
+            raise self._error
+        self._queue.put(samples)
+    
+    def _drain_queue(self) -> None:
+        """Laço da thread de escrita: grava os blocos até receber None."""
+        while True:
+            samples = self._queue.get()
+            if samples is None:
+                return
+            if self._error is None:
+                try:
+                    self.file.write(samples.tobytes())
+                except OSError as error:
+                    self._error = error
+    
+    def close(self) -> None:
+        """Aguarda a escrita pendente e corrige os tamanhos do cabeçalho RIFF."""
+        if self.file.closed:
+            return
+        
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        
+        try:
+            if self._error is not None:
+                raise self._error
+            if self.raw:
+                return
+            
+            data_bytes = self.frames_written * self.dtype.itemsize
+            if data_bytes % 2:
+                # Chunks RIFF têm tamanho par
+                self.file.write(b"\x00")
+            
+            riff_size = min(self.file.tell() - 8, 0xFFFFFFFF)
+            self.file.seek(4)
+            self.file.write(struct.pack("<I", riff_size))
+            if self._fact_offset is not None:
+                self.file.seek(self._fact_offset)
+                self.file.write(struct.pack("<I", min(self.frames_written, 0xFFFFFFFF)))
+            self.file.seek(self._data_offset)
+            self.file.write(struct.pack("<I", min(data_bytes, 0xFFFFFFFF)))
+        finally:
+            self.file.close()
+    
+    def __enter__(self) -> "WavStreamWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class WavReader:
+    """
+    Leitor de WAV por memória mapeada: só o cabeçalho é lido na abertura e o
+    chunk de dados PCM (int16, float32, ...) é acessado sob demanda, então
+    arquivos muito maiores que a memória podem ser percorridos em janelas.
+    
+    Com `raw_format`, o arquivo é PCM cru mono (sem cabeçalho) nesse formato
+    (ver DigitalEncoder.AUDIO_FORMATS), à taxa `sample_rate`.
+    """
+    
+    def __init__(self, filename: str, raw_format: str = None, sample_rate: int = 44100):
+        if raw_format is not None:
+            if raw_format not in DigitalEncoder.AUDIO_FORMATS:
+                raise ValueError(f"Formato de áudio '{raw_format}' não suportado")
+            dtype = DigitalEncoder.AUDIO_FORMATS[raw_format][0]
+            self.sample_rate = sample_rate
+            # np.memmap não aceita arquivos vazios
+            if os.path.getsize(filename):
+                self.samples = np.memmap(filename, dtype=dtype, mode="r")
+            else:
+                self.samples = np.empty(0, dtype=dtype)
+            return
+        
+        self.sample_rate, samples = wavfile.read(filename, mmap=True)
+        # Apenas o primeiro canal; continua sendo uma view do arquivo mapeado
+        self.samples = samples[:, 0] if samples.ndim > 1 else samples
+    
+    def __len__(self) -> int:
+        return len(self.samples)
+    
+    def windows(self, window_samples: int, overlap_samples: int = 0) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Percorre o arquivo em janelas de tamanho fixo que se sobrepõem em
+        `overlap_samples` amostras, para que um símbolo que cruze o fim de uma
+        janela apareça inteiro na seguinte.
+        
+        Yields:
+            Tuplas (posição da primeira amostra, janela de amostras)
+        """
+        if overlap_samples >= window_samples:
+            raise ValueError("A sobreposição deve ser menor que a janela")
+        
+        step = window_samples - overlap_samples
+        offset = 0
+        while offset < len(self.samples):
+            yield offset, self.samples[offset:offset + window_samples]
+            if offset + window_samples >= len(self.samples):
+                break
+            offset += step
+    
+    def symbol_windows(self, samples_per_symbol: int,
+                       symbols_per_window: int = 4096) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Janelas com um número inteiro de símbolos, construídas sobre `windows`
+        com sobreposição de um símbolo; cada símbolo é entregue exatamente uma vez.
+        
+        Yields:
+            Tuplas (índice do primeiro símbolo, amostras dos símbolos completos)
+        """
+        window = samples_per_symbol * (symbols_per_window + 1)
+        next_symbol = 0
+        for offset, block in self.windows(window, samples_per_symbol):
+            start = next_symbol * samples_per_symbol - offset
+            n_symbols = (len(block) - start) // samples_per_symbol
+            if n_symbols > 0:
+                yield next_symbol, block[start:start + n_symbols * samples_per_symbol]
+                next_symbol += n_symbols
+    
+    def close(self) -> None:
+        """Libera o mapeamento do arquivo."""
+        self.samples = None
+    
+    def __enter__(self) -> "WavReader":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class SymbolTimingRecovery:
+    """
+    Recuperação do relógio de símbolo por rastreamento de transições.
+    
+    O sinal é processado em blocos de `block_symbols` símbolos. Em cada bloco
+    as transições entre níveis (decisão abrupta por amostra) são comparadas
+    com as fronteiras previstas pela fase e pelo período atuais. O erro de
+    fase é medido no centroide das transições (a média dos erros), sem
+    extrapolar; o período só é corrigido pela inclinação dos erros quando as
+    transições cobrem ao menos um quarto do bloco, e a correção por bloco é
+    limitada a `max_period_step` do período. Os primeiros símbolos
+    (aquisição) usam blocos 8 vezes menores, para que derivas grandes sejam
+    capturadas antes de acumular meio símbolo de erro.
+    
+    As amostras podem chegar em pedaços de qualquer tamanho; o que ainda não
+    foi consumido fica guardado até o próximo `process`.
+    """
+    
+    def __init__(self, samples_per_symbol: float, ternary: bool = False, block_symbols: int = 128,
+                 phase_gain: float = 1.0, period_gain: float = 0.5, max_period_step: float = 0.002,
+                 encoder: DigitalEncoder = None):
+        """
+        Args:
+            samples_per_symbol: Duração nominal de um símbolo, em amostras
+            ternary: Se True, o sinal tem três níveis (AMI)
+            block_symbols: Símbolos por bloco do laço de rastreamento
+            phase_gain: Fração do erro de fase corrigida a cada bloco
+            period_gain: Fração do erro de período corrigida a cada bloco
+            max_period_step: Maior correção do período por bloco, como fração dele
+            encoder: DigitalEncoder usado para estimar os níveis
+        """
+        self.encoder = encoder if encoder is not None else DigitalEncoder()
+        self.period = float(samples_per_symbol)
+        self.ternary = ternary
+        self.block_symbols = block_symbols
+        self.phase_gain = phase_gain
+        self.period_gain = period_gain
+        self.max_period_step = max_period_step
+        
+        # Aquisição: blocos menores durante os primeiros símbolos
+        self.acquisition_block = max(block_symbols // 8, 8)
+        self.acquisition_symbols = 4 * block_symbols
+        self.symbols_tracked = 0
+        
+        self.boundary = 0.0  # Posição absoluta do início do próximo símbolo
+        self.thresholds = None
+        self.buffer = np.empty(0, dtype=np.float32)
+        self.buffer_start = 0  # Posição absoluta da primeira amostra do buffer
+    
+    def process(self, samples: np.ndarray, final: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Acrescenta amostras e processa todos os blocos já cobertos por elas.
+        
+        Args:
+            samples: Próximas amostras de áudio (ponto flutuante)
+            final: Se True, processa também o bloco incompleto do fim do sinal
+            
+        Returns:
+            Tupla (centros absolutos dos símbolos, média da metade central de cada um)
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.thresholds is None and len(samples):
+            self.thresholds = self.encoder.level_thresholds(samples, self.ternary)
+        self.buffer = np.concatenate((self.buffer, samples))
+        buffer_end = self.buffer_start + len(self.buffer)
+        
+        centers = [np.empty(0)]
+        while self.boundary + self.period / 2 < buffer_end:
+            block_symbols = self._block_size()
+            block_end = self.boundary + (block_symbols + 1) * self.period
+            if block_end > buffer_end and not final:
+                break
+            centers.append(self._track_block(buffer_end, block_symbols))
+        centers = np.concatenate(centers)
+        
+        # Apenas símbolos dentro do sinal; tolera um quarto de símbolo no fim,
+        # onde a fronteira estimada pode passar um pouco do último símbolo
+        centers = centers[centers + self.period / 4 <= buffer_end]
+        values = self._integrate(centers)
+        
+        # Descarta o que já não é necessário (mantém um símbolo antes da fronteira)
+        keep_from = min(max(int(self.boundary - self.period), self.buffer_start), buffer_end)
+        self.buffer = self.buffer[keep_from - self.buffer_start:]
+        self.buffer_start = keep_from
+        return centers, values
+    
+    def _block_size(self) -> int:
+        """Símbolos do próximo bloco: menor durante a aquisição."""
+        if self.symbols_tracked < self.acquisition_symbols:
+            return self.acquisition_block
+        return self.block_symbols
+    
+    def _track_block(self, buffer_end: int, block_symbols: int) -> np.ndarray:
+        """Corrige fase e período com as transições de um bloco e gera os seus centros."""
+        period = self.period
+        start = max(int(np.floor(self.boundary - period / 2)), self.buffer_start)
+        stop = min(int(np.ceil(self.boundary + (block_symbols - 0.5) * period)), buffer_end)
+        region = self.buffer[start - self.buffer_start:stop - self.buffer_start]
+        
+        # Média móvel de um quarto de símbolo antes da decisão por amostra,
+        # para que o ruído não gere transições espúrias
+        width = max(int(period / 4), 1)
+        if len(region) > width:
+            cumulative = np.concatenate(([0.0], np.cumsum(region, dtype=np.float64)))
+            region = (cumulative[width:] - cumulative[:-width]) / width
+            start += (width - 1) / 2
+        
+        # Fronteira entre duas amostras de níveis diferentes
+        decisions = self.encoder.slice_levels(region, self.ternary, self.thresholds)
+        transitions = start + np.flatnonzero(decisions[1:] != decisions[:-1]) + 0.5
+        
+        if len(transitions):
+            index = np.round((transitions - self.boundary) / period)
+            error = transitions - (self.boundary + index * period)
+            
+            # Erro de fase no centroide das transições, onde ele é medido
+            centroid = index.mean()
+            phase_error = error.mean()
+            
+            # Inclinação só com transições espalhadas pelo bloco: poucas
+            # bordas próximas transformariam a quantização em erro de período
+            step = 0.0
+            if np.ptp(index) >= block_symbols / 4:
+                slope = np.polyfit(index - centroid, error, 1)[0]
+                limit = self.max_period_step * period
+                step = float(np.clip(self.period_gain * slope, -limit, limit))
+            
+            # Corrige a fase no centroide e ajusta o início do bloco à nova inclinação
+            self.period += step
+            self.boundary += self.phase_gain * phase_error - step * centroid
+        
+        centers = self.boundary + (np.arange(block_symbols) + 0.5) * self.period
+        self.boundary += block_symbols * self.period
+        self.symbols_tracked += block_symbols
+        return centers
+    
+    def _integrate(self, centers: np.ndarray) -> np.ndarray:
+        """Integra (média) a metade central de cada símbolo usando soma acumulada."""
+        width = max(int(round(self.period / 2)), 1)
+        starts = np.round(centers - width / 2).astype(np.int64) - self.buffer_start
+        starts = np.clip(starts, 0, max(len(self.buffer) - width, 0))
+        cumulative = np.concatenate(([0.0], np.cumsum(self.buffer, dtype=np.float64)))
+        ends = np.minimum(starts + width, len(self.buffer))
+        return (cumulative[ends] - cumulative[starts]) / np.maximum(ends - starts, 1)
+
+
+class StreamEncoder:
+    """
+    Codificador incremental: recebe a mensagem em blocos de bits (ou bytes) e
+    mantém o estado de linha entre as chamadas, de forma que a concatenação
+    das saídas é idêntica a codificar a mensagem inteira de uma vez.
+    """
+    
+    def __init__(self, method: str = "Manchester", encoder: DigitalEncoder = None):
+        self.encoder = encoder if encoder is not None else DigitalEncoder()
+        if method not in self.encoder.vectorized_encoding_methods:
+            raise ValueError(f"Método de codificação '{method}' não implementado")
+        
+        self.method = method
+        self.state = 0  # Estado de linha atual (0 = estado inicial do codificador)
+    
+    def encode(self, chunk: Signal) -> Signal:
+        """Codifica um bloco de bits continuando a partir do estado atual."""
+        bits = np.asarray(chunk, dtype=np.int8)
+        encoded = self.encoder.vectorized_encoding_methods[self.method](bits)
+        
+        result = self.encoder._with_line_state(self.method, encoded, self.state)
+        self.state ^= int(self.encoder._line_state_toggle(self.method, bits, encoded))
+        return self.encoder.make_signal(result, self.method)
+    
+    def encode_bytes(self, chunk: bytes) -> Signal:
+        """Codifica um bloco de bytes pela tabela de `DigitalEncoder.byte_lookup_table`."""
+        _, toggles = self.encoder.byte_lookup_table(self.method)
+        values = np.frombuffer(chunk, dtype=np.uint8)
+        encoded = self.encoder.encode_bytes(values, self.method).data
+        
+        result = self.encoder._with_line_state(self.method, encoded, self.state)
+        self.state ^= int(np.bitwise_xor.reduce(toggles[values])) if values.size else 0
+        return self.encoder.make_signal(result, self.method)
+    
+    def iter_encode(self, chunks: Iterable[Signal]) -> Iterator[Signal]:
+        """Gera a saída codificada bloco a bloco para uma sequência de blocos de bits."""
+        for chunk in chunks:
+            yield self.encode(chunk)
+
+
+class StreamDecoder:
+    """
+    Decodificador incremental. Entre as chamadas guarda o meio símbolo que
+    sobrar no fim de um bloco e o contexto de linha necessário para o
+    próximo (nível anterior, último par ou última marca AMI). A concatenação
+    das saídas, mais `flush()`, é idêntica a decodificar o sinal inteiro com
+    `DigitalEncoder.decode(..., vectorized=True)`.
+    """
+    
+    def __init__(self, method: str = "Manchester", encoder: DigitalEncoder = None):
+        self.encoder = encoder if encoder is not None else DigitalEncoder()
+        if method not in self.encoder.vectorized_decoding_methods:
+            raise ValueError(f"Método de decodificação '{method}' não implementado")
+        
+        self.method = method
+        self.symbols_per_bit = self.encoder.SYMBOLS_PER_BIT[method]
+        self.leftover = np.empty(0, dtype=np.int8)  # Meio símbolo pendente
+        self.context = np.empty(0, dtype=np.int8)   # Símbolo de contexto anterior
+        self.symbols_decoded = 0
+    
+    def decode(self, chunk: Signal, return_invalid: bool = False):
+        """
+        Decodifica um bloco de valores codificados.
+        
+        Args:
+            chunk: Bloco de valores codificados
+            return_invalid: Se True, retorna também os índices (globais) dos
+                símbolos inválidos encontrados neste bloco
+            
+        Returns:
+            Bits decodificados do bloco, ou a tupla (bits, índices inválidos)
+        """
+        data = np.concatenate((self.leftover, np.asarray(chunk, dtype=np.int8)))
+        n_symbols = len(data) // self.symbols_per_bit
+        body = data[:n_symbols * self.symbols_per_bit]
+        self.leftover = data[len(body):]
+        
+        # O contexto é decodificado junto com o bloco e depois descartado
+        n_context = len(self.context) // self.symbols_per_bit
+        decode = self.encoder.vectorized_decoding_methods[self.method]
+        decoded, invalid = decode(np.concatenate((self.context, body)))
+        
+        decoded = decoded[n_context:n_context + n_symbols]
+        invalid = invalid[invalid >= n_context] - n_context + self.symbols_decoded
+        
+        self._update_context(body)
+        self.symbols_decoded += n_symbols
+        decoded = self.encoder.make_signal(decoded)
+        return (decoded, invalid) if return_invalid else decoded
+    
+    def _update_context(self, body: np.ndarray) -> None:
+        """Guarda o símbolo do qual o próximo bloco depende."""
+        if not len(body) or self.method == "NRZ":
+            return
+        
+        if self.method == "NRZI":
+            self.context = body[-1:].copy()
+        elif self.method == "AMI":
+            marks = body[body != 0]
+            if len(marks):
+                self.context = marks[-1:].copy()
+        elif self.method == "Manchester":
+            # Um par inválido repete o último bit válido
+            first, second = self.encoder._symbol_halves(body)
+            valid = np.flatnonzero((first + second) == 1)
+            if len(valid):
+                self.context = body[2 * valid[-1]:2 * valid[-1] + 2].copy()
+        else:
+            self.context = body[-2:].copy()
+    
+    def flush(self) -> Signal:
+        """
+        Encerra o fluxo. O meio símbolo pendente é descartado (como na
+        decodificação de uma vez) e, em Manchester, os bits finais de padding
+        são emitidos para completar o último byte.
+        """
+        self.leftover = np.empty(0, dtype=np.int8)
+        padding = -self.symbols_decoded % 8 if self.method == "Manchester" else 0
+        return self.encoder.make_signal(np.zeros(padding, dtype=np.int8))
+    
+    def iter_decode(self, chunks: Iterable[Signal]) -> Iterator[Signal]:
+        """Gera os bits decodificados bloco a bloco, terminando com `flush()`."""
+        for chunk in chunks:
+            yield self.decode(chunk)
+        yield self.flush()
+
+
+class LoopbackSink:
+    """
+    Substituto de um dispositivo de reprodução: guarda cada bloco recebido
+    e o instante de chegada, para conferir o áudio e o ritmo de entrega.
+    """
+    
+    def __init__(self):
+        self.blocks = []
+        self.arrival_times = []
+    
+    def write(self, block: np.ndarray) -> None:
+        self.blocks.append(block)
+        self.arrival_times.append(time.monotonic())
+    
+    def samples(self) -> np.ndarray:
+        """Todo o áudio recebido, concatenado."""
+        return np.concatenate(self.blocks) if self.blocks else np.empty(0)
+
+
+class RealtimeAudioStream:
+    """
+    Gerador de áudio em tempo real com latência limitada.
+    
+    Uma thread produtora codifica os blocos de entrada (StreamEncoder, se
+    `method` for informado), gera as amostras e as corta em blocos PCM de
+    `block_samples` amostras, guardados em uma fila de `lookahead_blocks`
+    blocos. O consumidor (iteração ou `run`) entrega um bloco a cada
+    block_samples / sample_rate segundos; se o bloco da vez ainda não estiver
+    pronto, entrega silêncio no lugar e conta um underrun. A latência entre
+    produzir e tocar uma amostra é no máximo a da fila cheia (`latency`).
+    
+    Com realtime=False o ritmo é o do consumidor (ex.: gravar em arquivo) e
+    não há underruns.
+    """
+    
+    def __init__(self, chunks: Iterable[Signal], method: str = None, sample_rate: int = 44100,
+                 bit_rate: int = 300, block_samples: int = 1024, lookahead_blocks: int = 8,
+                 sample_format: str = "int16", realtime: bool = True, encoder: DigitalEncoder = None):
+        """
+        Args:
+            chunks: Blocos de sinal codificado, ou blocos de bits se `method` for informado
+            method: Se informado, os blocos são codificados por um StreamEncoder deste método
+            sample_rate: Taxa de amostragem em Hz
+            bit_rate: Taxa de bits por segundo
+            block_samples: Amostras por bloco entregue
+            lookahead_blocks: Blocos prontos que podem aguardar na fila
+            sample_format: Formato das amostras (ver DigitalEncoder.AUDIO_FORMATS)
+            realtime: Se True, entrega os blocos no ritmo da taxa de amostragem
+            encoder: DigitalEncoder usado para codificar e gerar o áudio
+        """
+        if lookahead_blocks < 1:
+            raise ValueError("A fila precisa de pelo menos um bloco")
+        
+        self.encoder = encoder if encoder is not None else DigitalEncoder()
+        self.chunks = chunks
+        self.stream = self.encoder.stream_encoder(method) if method is not None else None
+        self.sample_rate = sample_rate
+        self.samples_per_bit = self.encoder.samples_per_bit(sample_rate, bit_rate)
+        self.block_samples = block_samples
+        self.sample_format = sample_format
+        self.realtime = realtime
+        self.silence = np.full(block_samples, self.encoder.level_amplitudes(sample_format)[1])
+        
+        self.block_duration = block_samples / sample_rate
+        self.latency = lookahead_blocks * self.block_duration
+        self.underruns = 0
+        self.blocks_sent = 0
+        
+        self._queue = queue.Queue(maxsize=lookahead_blocks)
+        self._primed = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._error = None
+    
+    def _put(self, block: Optional[np.ndarray]) -> bool:
+        """Coloca um bloco na fila, desistindo se o consumidor parou."""
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(block, timeout=0.1)
+            except queue.Full:
+                # Fila cheia: o consumidor já pode começar
+                self._primed.set()
+                continue
+            if self._queue.full():
+                self._primed.set()
+            return True
+        return False
+    
+    def _produce(self) -> None:
+        """Laço da thread produtora: codifica, gera o áudio e enfileira blocos fixos."""
+        try:
+            pending = self.silence[:0]
+            symbols_rendered = 0
+            for chunk in self.chunks:
+                if self.stream is not None:
+                    chunk = self.stream.encode(chunk)
+                audio = self.encoder.render_waveform(chunk, self.samples_per_bit, self.sample_format,
+                                                     symbols_rendered)
+                symbols_rendered += len(chunk)
+                pending = np.concatenate((pending, audio))
+                
+                n_blocks = len(pending) // self.block_samples
+                for k in range(n_blocks):
+                    if not self._put(pending[k * self.block_samples:(k + 1) * self.block_samples]):
+                        return
+                pending = pending[n_blocks * self.block_samples:]
+            
+            if len(pending):
+                # Último bloco completado com silêncio
+                self._put(np.concatenate((pending, self.silence[len(pending):])))
+        except Exception as error:
+            self._error = error
+        finally:
+            self._put(None)
+            self._primed.set()
+    
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Gera os blocos PCM (no tipo de `sample_format`) no ritmo de reprodução."""
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+        try:
+            # Espera a fila encher antes de começar a contar o tempo
+            self._primed.wait()
+            start = time.monotonic()
+            while True:
+                if self.realtime:
+                    wait = start + self.blocks_sent * self.block_duration - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                    try:
+                        block = self._queue.get_nowait()
+                    except queue.Empty:
+                        self.underruns += 1
+                        block = self.silence
+                else:
+                    block = self._queue.get()
+                
+                if block is None:
+                    break
+                self.blocks_sent += 1
+                yield block
+            
+            if self._error is not None:
+                raise self._error
+        finally:
+            self._stopped.set()
+            self._thread.join()
+    
+    def run(self, sink) -> int:
+        """
+        Envia todos os blocos para `sink` e retorna o número de underruns.
+        
+        `sink` pode ser um caminho (".wav" grava um WAV com WavStreamWriter;
+        qualquer outro, como um FIFO, recebe PCM cru), um objeto de arquivo
+        binário ou um LoopbackSink.
+        """
+        owned = isinstance(sink, (str, os.PathLike))
+        if owned:
+            if os.fspath(sink).lower().endswith(".wav"):
+                sink = WavStreamWriter(sink, self.sample_rate, self.sample_format)
+            else:
+                sink = open(sink, "wb")
+        
+        try:
+            takes_arrays = isinstance(sink, (WavStreamWriter, LoopbackSink))
+            for block in self:
+                sink.write(block if takes_arrays else block.tobytes())
+                if not takes_arrays and hasattr(sink, "flush"):
+                    sink.flush()
+        finally:
+            if owned:
+                sink.close()
+        return self.underruns
+
+
+class BerEstimate(NamedTuple):
+    """Resultado de `TransmissionSystem.estimate_ber`."""
+    ber: float           # Estimativa pontual (erros / bits)
+    lower: float         # Limite inferior do intervalo de Clopper-Pearson
+    upper: float         # Limite superior do intervalo de Clopper-Pearson
+    confidence: float    # Nível de confiança do intervalo
+    bit_errors: int
+    bits: int
+    batches: int
+
+
 class TransmissionSystem:
     """
     Sistema completo de transmissão digital, incluindo codificação,
     simulação de canal e decodificação.
     """
     
-    def __init__(self):
+    # Dígitos hexadecimais em ASCII, indexados pelo valor do nibble
+    HEX_DIGITS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+    
+    # Nível resultante de uma inversão no canal, indexado por nível + 1:
+    # -1 -> 0 (simplificação para AMI), 0 -> 1, 1 -> 0
+    FLIPPED_LEVEL = np.array([0, 1, 0], dtype=np.int8)
+    
+    # Preâmbulo de sincronismo de 64 bits. A correlação é feita sobre os
+    # níveis de linha, e não sobre os bits, então a palavra foi escolhida por
+    # busca entre sequências aleatórias: depois de cada um dos códigos de
+    # linha, a correlação normalizada com versões deslocadas de si mesma fica
+    # abaixo de 0.5 e, com dados aleatórios ou texto, abaixo de 0.6. Com
+    # número par de uns e de zeros, todos os métodos terminam o preâmbulo no
+    # estado de linha inicial, então ele pode ser codificado separadamente e
+    # concatenado à mensagem.
+    PREAMBLE = np.unpackbits(np.array([0xBC, 0x1C, 0x18, 0x95, 0x13, 0x50, 0x48, 0xEC],
+                                      dtype=np.uint8)).view(np.int8)
+    
+    # Parâmetro de cada modelo de canal varrido por `ber_sweep`
+    NOISE_PARAMETERS = {
+        "BSC": "noise_level",
+        "AWGN": "ebn0_db",
+        "Gilbert-Elliott": "p_good_to_bad",
+    }
+    
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed: Semente do gerador aleatório usado pelo canal (None = aleatória)
+        """
         self.encoder = DigitalEncoder()
+        self.rng = np.random.default_rng(seed)
         
-    def string_to_binary(self, text: str) -> List[int]:
-        """Converte uma string para uma lista de bits."""
-        binary = []
-        for char in text:
-            # Converter cada caractere para seu valor ASCII e depois para binário
-            ascii_val = ord(char)
-            for i in range(7, -1, -1):  # 8 bits para cada caractere
-                binary.append((ascii_val >> i) & 1)
-        return binary
-    
-    def binary_to_string(self, binary: List[int]) -> str:
-        """Converte uma lista de bits para string."""
-        result = ""
-        for i in range(0, len(binary), 8):
-            # Garantir que temos um byte completo
-            if i + 8 <= len(binary):
-                byte = binary[i:i+8]
-                char_code = sum(bit << (7-j) for j, bit in enumerate(byte))
-                result += chr(char_code)
-        return result
-    
-    def binary_to_hex(self, binary: List[int]) -> str:
-        """Converte uma lista de bits para representação hexadecimal."""
-        hex_result = ""
-        for i in range(0, len(binary), 4):
-            if i + 4 <= len(binary):
-                nibble = binary[i:i+4]
-                hex_value = sum(bit << (3-j) for j, bit in enumerate(nibble))
-                hex_result += format(hex_value, 'x').upper()
-        return hex_result
-    
-    def simulate_channel(self, encoded_data: List[int], noise_level: float = 0.0) -> List[int]:
+        # Modelos de canal aceitos por `transmit`
+        self.channel_models: Dict[str, Callable] = {
+            "BSC": self.simulate_channel,
+            "AWGN": self.awgn_channel,
+            "Gilbert-Elliott": self.gilbert_elliott_channel,
+        }
+    
+    def get_rng(self, seed: Optional[int] = None,
+                rng: Optional[np.random.Generator] = None) -> np.random.Generator:
+        """
+        Escolhe o gerador aleatório de uma chamada: `rng` explícito, um novo
+        gerador a partir de `seed`, ou o gerador do próprio sistema.
+        """
+        if rng is not None:
+            return rng
+        if seed is not None:
+            return np.random.default_rng(seed)
+        return self.rng
+        
+    def bytes_to_binary(self, data: bytes) -> Signal:
+        """Converte bytes para um Signal de bits (8 bits por byte, MSB primeiro)."""
+        values = np.frombuffer(data, dtype=np.uint8)
+        return self.encoder.make_signal(np.unpackbits(values).view(np.int8))
+    
+    def binary_to_bytes(self, binary: Signal) -> bytes:
+        """Converte um Signal (ou lista) de bits para bytes, ignorando um byte final incompleto."""
+        bits = np.asarray(binary, dtype=np.int8)
+        return np.packbits(bits[:len(bits) // 8 * 8] != 0).tobytes()
+    
+    def string_to_binary(self, text: str, encoding: str = "utf-8") -> Signal:
+        """
+        Converte uma string para um Signal de bits.
+        
+        O texto é codificado em bytes (UTF-8 por padrão, de modo que caracteres
+        acima de 255 não são truncados); bytes e bytearray são usados diretamente.
+        """
+        data = text.encode(encoding) if isinstance(text, str) else text
+        return self.bytes_to_binary(data)
+    
+    def binary_to_string(self, binary: Signal, encoding: str = "utf-8") -> str:
+        """
+        Converte um Signal (ou lista) de bits para string. Sequências inválidas
+        na codificação (ex.: bytes corrompidos pelo canal) viram U+FFFD.
+        """
+        return self.binary_to_bytes(binary).decode(encoding, errors="replace")
+    
+    def binary_to_hex(self, binary: Signal) -> str:
+        """Converte um Signal (ou lista) de bits para representação hexadecimal."""
+        bits = np.asarray(binary, dtype=np.uint8)
+        nibbles = bits[:len(bits) // 4 * 4].reshape(-1, 4) @ np.array([8, 4, 2, 1], dtype=np.uint8)
+        return self.HEX_DIGITS[nibbles].tobytes().decode("ascii")
+    
+    def flip_positions(self, length: int, probability: float,
+                       rng: np.random.Generator) -> np.ndarray:
+        """
+        Posições (em ordem) invertidas por um canal que inverte cada um de
+        `length` valores, independentemente, com a probabilidade dada.
+        
+        Para probabilidades baixas a quantidade de inversões é sorteada de uma
+        binomial e as posições de uma amostra sem reposição, o que é exato
+        mesmo em 1e-9 e não custa um número aleatório por valor. Acima de 1%
+        compara uniformes float64 (resolução de 2**-53) com a probabilidade.
+        """
+        if length <= 0 or probability <= 0:
+            return np.empty(0, dtype=np.int64)
+        if probability >= 1:
+            return np.arange(length)
+        if probability > 0.01:
+            return np.flatnonzero(rng.random(length) < probability)
+        
+        count = rng.binomial(length, probability)
+        return np.sort(rng.choice(length, count, replace=False))
+    
+    def simulate_channel(self, encoded_data: Signal, noise_level: float = 0.0,
+                         seed: Optional[int] = None,
+                         rng: Optional[np.random.Generator] = None) -> Signal:
         """
         Simula um canal de transmissão com possível adição de ruído.
         
+        As posições invertidas são sorteadas de uma só vez (ver `flip_positions`)
+        e recebem o nível da tabela FLIPPED_LEVEL. Com a mesma `seed` o
+        resultado é reproduzível.
+        
         Args:
-            encoded_data: Lista de valores codificados
+            encoded_data: Signal (ou lista) de valores codificados
             noise_level: Probabilidade de um bit ser invertido (0 a 1)
+            seed: Semente para esta chamada (ver `get_rng`)
+            rng: Gerador numpy.random.Generator a usar (ver `get_rng`)
             
         Returns:
-            Lista de valores possivelmente modificados pelo ruído
+            Signal com os valores possivelmente modificados pelo ruído
         """
+        if not isinstance(encoded_data, Signal):
+            encoded_data = self.encoder.make_signal(encoded_data)
+        
         if noise_level <= 0:
             return encoded_data.copy()
         
-        noisy_data = []
-        for bit in encoded_data:
-            # Adicionar ruído (inversão de bit) com probabilidade noise_level
-            if np.random.random() < noise_level:
-                if bit == 0:
-                    noisy_data.append(1)
-                elif bit == 1:
-                    noisy_data.append(0)
-                else:  # Para AMI (-1)
-                    noisy_data.append(0)  # Simplificação para AMI
+        values = encoded_data.data
+        flips = self.flip_positions(len(values), noise_level, self.get_rng(seed, rng))
+        transmitted = values.copy()
+        transmitted[flips] = self.FLIPPED_LEVEL[values[flips] + 1]
+        return encoded_data.with_data(transmitted)
+    
+    def awgn_channel(self, encoded_data: Signal, ebn0_db: float = 10.0, samples_per_symbol: int = 8,
+                     block_symbols: int = 1 << 16, seed: Optional[int] = None,
+                     rng: Optional[np.random.Generator] = None) -> Signal:
+        """
+        Canal analógico com ruído branco gaussiano aditivo (AWGN) a uma dada Eb/N0.
+        
+        Cada valor de linha vira um pulso retangular de `samples_per_symbol`
+        amostras com a própria amplitude (-1, 0 ou 1). O ruído de cada amostra
+        tem variância N0 / 2, com Eb = energia média do sinal por bit de
+        informação (um bit ocupa SYMBOLS_PER_BIT valores de linha). O
+        receptor é o filtro casado do pulso retangular: integrate-and-dump
+        seguido de decisão nos limiares ideais (meio caminho entre os níveis).
+        
+        O sinal é processado em blocos de `block_symbols` valores, então a
+        memória não cresce com o tamanho da mensagem.
+        
+        Args:
+            encoded_data: Signal (ou lista) de valores codificados
+            ebn0_db: Razão Eb/N0 em dB
+            samples_per_symbol: Amostras por valor de linha na forma de onda
+            block_symbols: Valores de linha processados por bloco
+            seed: Semente para esta chamada (ver `get_rng`)
+            rng: Gerador numpy.random.Generator a usar (ver `get_rng`)
+            
+        Returns:
+            Signal com os níveis decididos pelo receptor
+        """
+        if not isinstance(encoded_data, Signal):
+            encoded_data = self.encoder.make_signal(encoded_data)
+        
+        values = encoded_data.data
+        if not len(values):
+            return encoded_data.copy()
+        
+        generator = self.get_rng(seed, rng)
+        ternary = encoded_data.method == "AMI" or bool(values.min() < 0)
+        thresholds = np.array([-0.5, 0.5]) if ternary else np.array([0.5])
+        
+        # Eb: energia por valor de linha (amplitude² × amostras) vezes valores por bit
+        symbols_per_bit = self.encoder.SYMBOLS_PER_BIT.get(encoded_data.method, 1)
+        energy_per_bit = np.mean(values.astype(np.float64) ** 2) * samples_per_symbol * symbols_per_bit
+        sigma = np.sqrt(energy_per_bit / (2 * 10 ** (ebn0_db / 10)))
+        
+        levels = np.empty_like(values)
+        for start in range(0, len(values), block_symbols):
+            block = values[start:start + block_symbols]
+            waveform = np.repeat(block.astype(np.float32), samples_per_symbol)
+            waveform += generator.standard_normal(len(waveform), dtype=np.float32) * np.float32(sigma)
+            integrated = self.encoder.integrate_and_dump(waveform, samples_per_symbol)
+            levels[start:start + len(block)] = self.encoder.slice_levels(integrated, ternary, thresholds)
+        
+        return encoded_data.with_data(levels)
+    
+    def burst_states(self, length: int, p_good_to_bad: float, p_bad_to_good: float,
+                     rng: np.random.Generator) -> np.ndarray:
+        """
+        Sequência de estados (False = bom, True = ruim) de uma cadeia de Markov
+        de dois estados, gerada por durações de permanência geométricas.
+        
+        Cada estado dura Geométrica(p de sair dele) símbolos; as durações são
+        sorteadas em lote e expandidas com np.repeat, sem laço por símbolo.
+        O estado inicial segue a distribuição estacionária da cadeia.
+        """
+        states = np.zeros(length, dtype=bool)
+        if not length or p_good_to_bad <= 0:
+            return states
+        if p_bad_to_good <= 0:
+            # O estado ruim é absorvente: começa no bom e só sorteia quanto ele dura
+            states[min(rng.geometric(p_good_to_bad), length):] = True
+            return states
+        
+        bad_first = rng.random() < p_good_to_bad / (p_good_to_bad + p_bad_to_good)
+        mean_pair = 1 / p_good_to_bad + 1 / p_bad_to_good
+        runs = [np.empty(0, dtype=np.int64)]
+        covered = 0
+        while covered < length:
+            # Pares (bom, ruim) suficientes para cobrir o restante, com folga
+            pairs = int(1.2 * (length - covered) / mean_pair) + 16
+            good = rng.geometric(p_good_to_bad, pairs)
+            bad = rng.geometric(p_bad_to_good, pairs)
+            block = np.column_stack((bad, good) if bad_first else (good, bad)).reshape(-1)
+            runs.append(block)
+            covered += int(block.sum())
+        runs = np.concatenate(runs)
+        
+        pattern = np.arange(len(runs)) % 2 == (0 if bad_first else 1)
+        return np.repeat(pattern, runs)[:length]
+    
+    def gilbert_elliott_channel(self, encoded_data: Signal, p_good_to_bad: float = 0.01,
+                                p_bad_to_good: float = 0.1, error_good: float = 0.0,
+                                error_bad: float = 0.5, seed: Optional[int] = None,
+                                rng: Optional[np.random.Generator] = None) -> Signal:
+        """
+        Canal com erros em rajada (modelo de Gilbert-Elliott).
+        
+        O canal alterna entre um estado bom e um ruim (ver `burst_states`);
+        em cada estado os valores são invertidos com a sua própria
+        probabilidade (posições sorteadas por `flip_positions`), pela mesma
+        tabela FLIPPED_LEVEL do `simulate_channel`.
+        A taxa média de erros é error_bad * p_gb / (p_gb + p_bg) +
+        error_good * p_bg / (p_gb + p_bg), e as rajadas duram em média 1 / p_bg.
+        
+        Args:
+            encoded_data: Signal (ou lista) de valores codificados
+            p_good_to_bad: Probabilidade de passar do estado bom ao ruim por símbolo
+            p_bad_to_good: Probabilidade de voltar do estado ruim ao bom por símbolo
+            error_good: Probabilidade de inversão no estado bom
+            error_bad: Probabilidade de inversão no estado ruim
+            seed: Semente para esta chamada (ver `get_rng`)
+            rng: Gerador numpy.random.Generator a usar (ver `get_rng`)
+            
+        Returns:
+            Signal com os valores possivelmente modificados pelas rajadas
+        """
+        if not isinstance(encoded_data, Signal):
+            encoded_data = self.encoder.make_signal(encoded_data)
+        
+        generator = self.get_rng(seed, rng)
+        values = encoded_data.data
+        states = self.burst_states(len(values), p_good_to_bad, p_bad_to_good, generator)
+        
+        transmitted = values.copy()
+        for in_state, error_rate in ((states, error_bad), (~states, error_good)):
+            positions = np.flatnonzero(in_state)
+            flips = positions[self.flip_positions(len(positions), error_rate, generator)]
+            transmitted[flips] = self.FLIPPED_LEVEL[values[flips] + 1]
+        return encoded_data.with_data(transmitted)
+    
+    def encode_preamble(self, method: str = None) -> Signal:
+        """
+        Valores de linha do PREAMBLE codificado com `method`. Métodos que não
+        são de codificação (ex.: "Binary" no menu) usam os próprios bits.
+        """
+        if method in self.encoder.encoding_methods:
+            return self.encoder.encode(self.PREAMBLE, method)
+        return self.encoder.make_signal(self.PREAMBLE)
+    
+    def find_frames(self, filename: str, method: str = "Manchester", bit_rate: int = 300,
+                    threshold: float = 0.85, min_spacing: int = None) -> np.ndarray:
+        """
+        Localiza, em uma gravação longa, o início (em amostras) de cada quadro
+        salvo com preâmbulo por `save_audio` ou gerado por `transmit`.
+        
+        Os dados do quadro começam logo após o preâmbulo, isto é,
+        len(encode_preamble(method)) símbolos depois da posição retornada.
+        `min_spacing` (em valores de linha, preâmbulo incluído) descarta
+        detecções dentro de um quadro já encontrado.
+        """
+        return self.encoder.find_preamble(filename, self.encode_preamble(method), bit_rate, threshold,
+                                          min_spacing=min_spacing)
+    
+    def messages_to_matrix(self, messages: Iterable[str], encoding: str = "utf-8") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Converte várias strings (ou bytes) em uma matriz de bits, uma mensagem
+        por linha, completando as mais curtas com zeros.
+        
+        Returns:
+            Tupla (matriz de bits int8, quantidade de bits reais de cada linha)
+        """
+        data = []
+        for text in messages:
+            if isinstance(text, str):
+                data.append(text.encode(encoding))
+            elif isinstance(text, (bytes, bytearray, memoryview)):
+                data.append(bytes(text))
             else:
-                noisy_data.append(bit)
+                # bytes([0, 1, ...]) viraria um byte por bit, sem erro nenhum
+                raise TypeError(f"Mensagem deve ser str ou bytes, não {type(text).__name__}; "
+                                "para bits use uma matriz (ver `bit_matrix`)")
+        lengths = np.array([len(item) for item in data], dtype=np.int64)
+        width = int(lengths.max()) if len(data) else 0
         
-        return noisy_data
+        padded = np.zeros((len(data), width), dtype=np.uint8)
+        if width:
+            flat = np.frombuffer(b"".join(data), dtype=np.uint8)
+            padded[np.arange(width) < lengths[:, np.newaxis]] = flat
+        return np.unpackbits(padded, axis=1).view(np.int8), 8 * lengths
+    
+    def bit_matrix(self, messages) -> np.ndarray:
+        """
+        Converte uma matriz de bits (np.ndarray ou listas aninhadas, uma
+        mensagem por linha) para int8, conferindo que só há 0s e 1s.
+        """
+        try:
+            values = np.atleast_2d(np.asarray(messages))
+        except ValueError as error:
+            raise ValueError("As mensagens em bits devem ter todas o mesmo comprimento") from error
+        
+        if values.ndim != 2 or values.dtype == object:
+            raise ValueError("As mensagens em bits devem formar uma matriz 2-D")
+        if values.dtype.kind not in "biuf" or not np.isin(values, (0, 1)).all():
+            raise ValueError("A matriz de mensagens só pode conter bits 0 e 1")
+        return values.astype(np.int8, copy=False)
+    
+    def transmit_many(self, messages, encoding_method: str = "Manchester",
+                      noise_level: float = 0.0, seed: Optional[int] = None,
+                      rng: Optional[np.random.Generator] = None, channel: str = "BSC",
+                      channel_params: Optional[dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Transmite muitas mensagens de uma vez, sem visualização nem texto.
+        
+        As mensagens formam uma matriz de bits (uma por linha); codificação e
+        decodificação trabalham no último eixo, então cada linha é codificada
+        a partir do estado de linha inicial, como uma chamada de `transmit`,
+        mas todas em uma só operação de array. O canal recebe as linhas em
+        sequência, como quadros enviados um após o outro no mesmo enlace.
+        
+        Args:
+            messages: Matriz 2-D de bits (array ou listas aninhadas, ver `bit_matrix`),
+                ou lista de strings/bytes (ver `messages_to_matrix`)
+            encoding_method: Método de codificação a ser utilizado
+            noise_level: Nível de ruído no canal "BSC" (0 a 1)
+            seed: Semente do ruído do canal, para reproduzir uma execução
+            rng: Gerador numpy.random.Generator para o ruído do canal
+            channel: Modelo de canal (ver `channel_models`)
+            channel_params: Parâmetros extras do modelo de canal
+            
+        Returns:
+            Tupla (matriz de bits decodificados, com a mesma forma da entrada;
+            número de bits errados em cada mensagem)
+        """
+        if not isinstance(messages, np.ndarray):
+            messages = list(messages)
+        text_types = (str, bytes, bytearray, memoryview)
+        if isinstance(messages, np.ndarray) or (messages and not isinstance(messages[0], text_types)):
+            bits = self.bit_matrix(messages)
+            lengths = np.full(len(bits), bits.shape[-1], dtype=np.int64)
+        else:
+            bits, lengths = self.messages_to_matrix(messages)
+        
+        if encoding_method not in self.encoder.vectorized_encoding_methods:
+            raise ValueError(f"Método de codificação '{encoding_method}' não implementado")
+        if channel not in self.channel_models:
+            raise ValueError(f"Modelo de canal '{channel}' não implementado")
+        
+        # Codificar todas as linhas de uma vez
+        encoded = self.encoder.vectorized_encoding_methods[encoding_method](bits)
+        
+        # O canal vê as mensagens concatenadas
+        params = dict(channel_params or {})
+        if channel == "BSC":
+            params.setdefault("noise_level", noise_level)
+        line = self.encoder.make_signal(encoded, encoding_method)
+        transmitted = self.channel_models[channel](line, seed=seed, rng=rng, **params)
+        received = transmitted.data.reshape(encoded.shape)
+        
+        # Decodificar linha a linha (Manchester completa até um byte: corta de volta)
+        decoded, _ = self.encoder.vectorized_decoding_methods[encoding_method](received)
+        decoded = decoded[..., :bits.shape[-1]]
+        
+        # Só os bits reais de cada mensagem contam como erro
+        real = np.arange(bits.shape[-1]) < lengths[:, np.newaxis]
+        errors = np.count_nonzero((decoded != bits) & real, axis=-1)
+        return decoded, errors
     
     def transmit(self, input_data: str, encoding_method: str = "Manchester", 
-                 noise_level: float = 0.0, visualize: bool = True) -> Tuple[str, List[int], List[int]]:
+                 noise_level: float = 0.0, visualize: bool = True,
+                 seed: Optional[int] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 preamble: bool = False, channel: str = "BSC",
+                 channel_params: Optional[dict] = None) -> Tuple[str, Signal, Signal]:
         """
         Realiza todo o processo de transmissão: codificação, simulação de canal e decodificação.
         
@@ -483,21 +2293,39 @@ class TransmissionSystem:
             encoding_method: Método de codificação a ser utilizado
             noise_level: Nível de ruído no canal (0 a 1)
             visualize: Se True, exibe visualizações das formas de onda
+            seed: Semente do ruído do canal, para reproduzir uma execução
+            rng: Gerador numpy.random.Generator para o ruído do canal
+            preamble: Se True, o sinal transmitido começa com o PREAMBLE, que
+                é descartado após a decodificação
+            channel: Modelo de canal (ver `channel_models`); "BSC" usa `noise_level`
+            channel_params: Parâmetros extras do modelo de canal (ex.: {"ebn0_db": 6})
             
         Returns:
-            Tupla com (dados decodificados como string, dados originais como bits, dados decodificados como bits)
+            Tupla com (dados decodificados como string, dados originais como Signal de bits,
+            dados decodificados como Signal de bits)
         """
         # Converter entrada para binário
         binary_data = self.string_to_binary(input_data)
         
-        # Codificar
-        encoded_data = self.encoder.encode(binary_data, encoding_method)
+        # Codificar (o preâmbulo vai na frente dos bits da mensagem)
+        if preamble:
+            framed = np.concatenate((self.PREAMBLE, binary_data.data))
+            encoded_data = self.encoder.encode(framed, encoding_method)
+        else:
+            encoded_data = self.encoder.encode(binary_data, encoding_method)
         
         # Simular canal com ruído
-        transmitted_data = self.simulate_channel(encoded_data, noise_level)
+        if channel not in self.channel_models:
+            raise ValueError(f"Modelo de canal '{channel}' não implementado")
+        params = dict(channel_params or {})
+        if channel == "BSC":
+            params.setdefault("noise_level", noise_level)
+        transmitted_data = self.channel_models[channel](encoded_data, seed=seed, rng=rng, **params)
         
         # Decodificar
         decoded_data = self.encoder.decode(transmitted_data, encoding_method)
+        if preamble:
+            decoded_data = decoded_data[len(self.PREAMBLE):]
         
         # Converter binário de volta para string
         output_data = self.binary_to_string(decoded_data)
@@ -508,8 +2336,151 @@ class TransmissionSystem:
         
         return output_data, binary_data, decoded_data
     
-    def save_audio(self, encoded_data: List[int], method: str, filename: str = None, 
-                  bit_rate: int = 300) -> str:
+    def count_bit_errors(self, bits: np.ndarray, method: str, channel: str = "BSC",
+                         channel_params: Optional[dict] = None,
+                         rng: Optional[np.random.Generator] = None) -> Tuple[int, int]:
+        """
+        Codifica `bits`, passa pelo canal e decodifica, sem conversão para texto.
+        
+        Returns:
+            Tupla (bits errados, valores de linha transmitidos); bits que o
+            decodificador não devolveu contam como errados
+        """
+        if channel not in self.channel_models:
+            raise ValueError(f"Modelo de canal '{channel}' não implementado")
+        
+        encoded = self.encoder.encode(bits, method)
+        received = self.channel_models[channel](encoded, rng=rng, **(channel_params or {}))
+        decoded = self.encoder.decode(received, method).data[:len(bits)]
+        
+        errors = np.count_nonzero(decoded != bits[:len(decoded)]) + len(bits) - len(decoded)
+        return int(errors), len(encoded)
+    
+    def ber_interval(self, bit_errors: int, bits: int, confidence: float = 0.95) -> Tuple[float, float]:
+        """Intervalo de confiança exato (Clopper-Pearson) para a BER."""
+        alpha = 1 - confidence
+        lower = beta.ppf(alpha / 2, bit_errors, bits - bit_errors + 1) if bit_errors > 0 else 0.0
+        upper = beta.ppf(1 - alpha / 2, bit_errors + 1, bits - bit_errors) if bit_errors < bits else 1.0
+        return float(lower), float(upper)
+    
+    def estimate_ber(self, method: str = "Manchester", noise_level: float = 0.0,
+                     channel: str = "BSC", channel_params: Optional[dict] = None,
+                     target_errors: int = 100, relative_width: Optional[float] = None,
+                     confidence: float = 0.95, batch_bits: int = 1 << 20,
+                     max_bits: int = 10 ** 9, seed: Optional[int] = None,
+                     rng: Optional[np.random.Generator] = None) -> BerEstimate:
+        """
+        Estima a BER de um método em um canal com parada adaptativa.
+        
+        Transmite lotes de bits aleatórios até juntar
+        `target_errors` erros ou, se `relative_width` for informado, até o
+        intervalo de Clopper-Pearson ficar mais estreito que relative_width × BER
+        (o que vier primeiro), sem passar de `max_bits`. BERs altas param em
+        poucos lotes; BERs baixas (ex.: 1e-6) rodam o necessário sem ajuste manual.
+        
+        O primeiro lote é pequeno; os seguintes têm o tamanho estimado para
+        alcançar `target_errors` pela BER observada (dobrando enquanto não
+        houver erros), limitado a `batch_bits`.
+        
+        Args:
+            method: Método de codificação
+            noise_level: Probabilidade de inversão do canal "BSC"
+            channel: Modelo de canal (ver `channel_models`)
+            channel_params: Parâmetros extras do modelo de canal
+            target_errors: Erros de bit que encerram a estimativa
+            relative_width: Largura relativa do intervalo que encerra a estimativa
+            confidence: Nível de confiança do intervalo
+            batch_bits: Tamanho máximo de um lote, em bits
+            max_bits: Limite de bits transmitidos
+            seed: Semente para esta chamada (ver `get_rng`)
+            rng: Gerador numpy.random.Generator a usar (ver `get_rng`)
+            
+        Returns:
+            BerEstimate com a BER, o intervalo e a quantidade de erros e bits
+        """
+        generator = self.get_rng(seed, rng)
+        params = dict(channel_params or {})
+        if channel == "BSC":
+            params.setdefault("noise_level", noise_level)
+        
+        min_batch = min(4096, batch_bits)
+        size = min_batch
+        bit_errors = bits = batches = 0
+        lower, upper = 0.0, 1.0
+        while bits < max_bits:
+            batch = generator.integers(0, 2, min(size, max_bits - bits), dtype=np.int8)
+            errors, _ = self.count_bit_errors(batch, method, channel, params, generator)
+            bit_errors += errors
+            bits += len(batch)
+            batches += 1
+            
+            lower, upper = self.ber_interval(bit_errors, bits, confidence)
+            if bit_errors >= target_errors:
+                break
+            if relative_width is not None and bit_errors and upper - lower <= relative_width * bit_errors / bits:
+                break
+            
+            # Próximo lote: bits esperados para completar os erros pedidos
+            if bit_errors:
+                size = int(np.ceil((target_errors - bit_errors) * bits / bit_errors))
+            else:
+                size = 2 * size
+            size = int(np.clip(size, min_batch, batch_bits))
+        
+        return BerEstimate(bit_errors / bits if bits else 0.0, lower, upper, confidence,
+                           bit_errors, bits, batches)
+    
+    def ber_sweep(self, methods: Iterable[str] = None, noise_levels: Iterable[float] = (0.0, 0.01, 0.05, 0.1),
+                  message_sizes: Iterable[int] = (128,), trials: int = 100, channel: str = "BSC",
+                  channel_params: Optional[dict] = None, seed: Optional[int] = None,
+                  max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Varredura Monte Carlo de BER em paralelo: métodos × níveis de ruído ×
+        tamanhos de mensagem.
+        
+        Cada ponto da grade roda `trials` mensagens aleatórias em um processo
+        de um ProcessPoolExecutor, com um gerador independente obtido de
+        SeedSequence(seed).spawn, então o resultado só depende de `seed`.
+        
+        Args:
+            methods: Métodos de codificação (None = todos)
+            noise_levels: Valores do parâmetro de ruído do canal (ver NOISE_PARAMETERS)
+            message_sizes: Tamanhos de mensagem, em bytes
+            trials: Mensagens transmitidas por ponto da grade
+            channel: Modelo de canal (ver `channel_models`)
+            channel_params: Parâmetros fixos do canal
+            seed: Semente da varredura
+            max_workers: Processos do pool (None = número de CPUs)
+            
+        Returns:
+            Lista de linhas (dicts) na ordem da grade, com erros de bit, BER,
+            taxa de mensagens erradas (FER) e goodput (bits entregues sem erro
+            por valor de linha transmitido)
+        """
+        if channel not in self.NOISE_PARAMETERS:
+            raise ValueError(f"Modelo de canal '{channel}' não implementado")
+        methods = list(methods) if methods is not None else self.encoder.get_available_encodings()
+        
+        grid = [(method, noise, size) for method in methods
+                for noise in noise_levels for size in message_sizes]
+        seeds = np.random.SeedSequence(seed).spawn(len(grid))
+        tasks = [(method, noise, size, trials, channel, channel_params or {}, child)
+                 for (method, noise, size), child in zip(grid, seeds)]
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(_sweep_point, tasks))
+    
+    def sweep_table(self, rows: List[Dict]) -> str:
+        """Formata o resultado de `ber_sweep` como uma tabela de texto."""
+        lines = [f"{'Método':<24}{'Ruído':>10}{'Bytes':>8}{'Erros':>10}{'BER':>12}{'FER':>8}{'Goodput':>9}"]
+        for row in rows:
+            lines.append(f"{row['method']:<24}{row['noise']:>10g}{row['message_bytes']:>8}"
+                         f"{row['bit_errors']:>10}{row['ber']:>12.3e}{row['fer']:>8.3f}{row['goodput']:>9.3f}")
+        return "\n".join(lines)
+    
+    def save_audio(self, encoded_data: Signal, method: str, filename: str = None, 
+                  bit_rate: int = 300, sample_format: str = "float32",
+                  preamble: bool = False) -> str:
         """
         Salva os dados codificados como arquivo de áudio.
         
@@ -518,6 +2489,9 @@ class TransmissionSystem:
             method: Método de codificação utilizado
             filename: Nome do arquivo (opcional)
             bit_rate: Taxa de bits por segundo
+            sample_format: Formato das amostras ("float32", "int16" ou "uint8")
+            preamble: Se True, o áudio começa com o PREAMBLE codificado, para
+                que o quadro possa ser localizado com `find_frames`
             
         Returns:
             Caminho do arquivo salvo
@@ -526,8 +2500,14 @@ class TransmissionSystem:
         if filename is None:
             filename = f"encoded_{method}_{len(encoded_data)}_bits.wav"
         
+        if preamble:
+            line_method = getattr(encoded_data, "method", None) or method
+            header = self.encode_preamble(line_method)
+            encoded_data = header.with_data(np.concatenate((header.data, np.asarray(encoded_data, dtype=np.int8))))
+        
         # Salvar como áudio
-        audio_path = self.encoder.save_audio_waveform(encoded_data, filename, bit_rate=bit_rate)
+        audio_path = self.encoder.save_audio_waveform(encoded_data, filename, bit_rate=bit_rate,
+                                                      sample_format=sample_format)
         
         return audio_path
     
@@ -611,6 +2591,38 @@ class TransmissionSystem:
                 print("Entrada inválida. Digite um número entre 1 e 7.")
 
 
+def _sweep_point(task: tuple) -> Dict:
+    """
+    Um ponto de `TransmissionSystem.ber_sweep`, executado em um processo do pool
+    (função de módulo para poder ser serializada).
+    """
+    method, noise, size, trials, channel, channel_params, seed_sequence = task
+    ts = TransmissionSystem()
+    rng = np.random.default_rng(seed_sequence)
+    params = dict(channel_params, **{TransmissionSystem.NOISE_PARAMETERS[channel]: noise})
+    
+    n_bits = 8 * size
+    bit_errors = frame_errors = line_values = 0
+    for _ in range(trials):
+        bits = rng.integers(0, 2, n_bits, dtype=np.int8)
+        errors, sent = ts.count_bit_errors(bits, method, channel, params, rng)
+        bit_errors += errors
+        frame_errors += errors > 0
+        line_values += sent
+    
+    total_bits = trials * n_bits
+    return {
+        "method": method,
+        "noise": noise,
+        "message_bytes": size,
+        "trials": trials,
+        "bit_errors": bit_errors,
+        "ber": bit_errors / total_bits if total_bits else 0.0,
+        "fer": frame_errors / trials if trials else 0.0,
+        "goodput": (trials - frame_errors) * n_bits / line_values if line_values else 0.0,
+    }
+
+
 # Menu principal com interface de texto
 def main_menu():
     ts = TransmissionSystem()